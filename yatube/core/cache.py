@@ -0,0 +1,236 @@
+"""Двухуровневый кэш: LRU в памяти процесса (L1) перед общим кэшем (L2).
+
+L2 - другой псевдоним из CACHES (файловый, БД, memcached, Redis), его
+видят все процессы. L1 хранит недавно прочитанные значения не дольше
+L1_TIMEOUT секунд и не больше L1_MAX_ENTRIES штук. Запись идёт сразу
+в L2 и обновляет L1 своего процесса.
+
+Согласованность держится на версиях: ключи с префиксами из
+SHARED_PREFIXES (версии лент, отметки изменений) всегда читаются из L2,
+а фрагменты хранят версию рядом со значением. Копия старой версии в L1
+другого процесса поэтому не отдаётся как свежая: core.caching
+перечитывает такое значение из L2 (get_shared).
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.TwoLevelCache',
+            'LOCATION': 'shared',
+            'OPTIONS': {'L1_MAX_ENTRIES': 500, 'L1_TIMEOUT': 30},
+        },
+        'shared': {...},
+    }
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+L1_MAX_ENTRIES = 1000
+L1_TIMEOUT = 30
+SHARED_PREFIXES = ('feed-version:', 'feed-changed:', 'profiling:')
+_MISSING = object()
+
+# L1 общий для всех потоков процесса: экземпляры бэкенда из caches
+# у каждого потока свои.
+_local_caches = {}
+_local_caches_lock = threading.Lock()
+
+
+class LocalCache:
+    """LRU со сроком жизни записей; значения хранятся в pickle, как
+    в LocMemCache, чтобы изменение прочитанного объекта не меняло кэш.
+    """
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires, pickled = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def set(self, key, value, timeout=None):
+        """Запоминает значение на L1_TIMEOUT, но не дольше timeout."""
+        lifetime = self.timeout if timeout is None else min(
+            timeout, self.timeout)
+        if lifetime <= 0:
+            self.discard(key)
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._data[key] = (time.monotonic() + lifetime, pickled)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def local_cache(name, max_entries, timeout):
+    key = (name, max_entries, timeout)
+    with _local_caches_lock:
+        if key not in _local_caches:
+            _local_caches[key] = LocalCache(max_entries, timeout)
+        return _local_caches[key]
+
+
+class TwoLevelCache(BaseCache):
+    """Бэкенд кэша: LOCATION - псевдоним общего кэша (L2) в CACHES."""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = location
+        self.shared_prefixes = tuple(
+            options.get('SHARED_PREFIXES', SHARED_PREFIXES))
+        self.local = local_cache(
+            location,
+            int(options.get('L1_MAX_ENTRIES', L1_MAX_ENTRIES)),
+            float(options.get('L1_TIMEOUT', L1_TIMEOUT)))
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _local_key(self, key, version):
+        if key.startswith(self.shared_prefixes):
+            return None
+        local_key = self.make_key(key, version)
+        self.validate_key(local_key)
+        return local_key
+
+    def _remember(self, local_key, value, timeout):
+        if local_key is None:
+            return
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is not None:
+            timeout -= time.time()
+        self.local.set(local_key, value, timeout)
+
+    def get_shared(self, key, default=None, version=None):
+        """Значение из L2 в обход L1; L1 обновляется прочитанным."""
+        local_key = self._local_key(key, version)
+        value = self.shared.get(key, _MISSING, version)
+        if value is _MISSING:
+            if local_key is not None:
+                self.local.discard(local_key)
+            return default
+        if local_key is not None:
+            self.local.set(local_key, value)
+        return value
+
+    def get(self, key, default=None, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            value = self.local.get(local_key)
+            if value is not _MISSING:
+                return value
+        return self.get_shared(key, default, version)
+
+    def get_many(self, keys, version=None):
+        found, missing = {}, []
+        for key in keys:
+            local_key = self._local_key(key, version)
+            value = (
+                _MISSING if local_key is None
+                else self.local.get(local_key))
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            shared = self.shared.get_many(missing, version)
+            for key, value in shared.items():
+                local_key = self._local_key(key, version)
+                if local_key is not None:
+                    self.local.set(local_key, value)
+            found.update(shared)
+        return found
+
+    def has_key(self, key, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None and (
+                self.local.get(local_key) is not _MISSING):
+            return True
+        return self.shared.has_key(key, version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self._local_key(key, version)
+        self.shared.set(key, value, self._shared_timeout(timeout), version)
+        self._remember(local_key, value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(
+            data, self._shared_timeout(timeout), version)
+        for key, value in data.items():
+            local_key = self._local_key(key, version)
+            if key in failed:
+                if local_key is not None:
+                    self.local.discard(local_key)
+            else:
+                self._remember(local_key, value, timeout)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        # add служит блокировкой: решает только L2, в L1 не кладётся.
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            self.local.discard(local_key)
+        return self.shared.add(
+            key, value, self._shared_timeout(timeout), version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            self.local.discard(local_key)
+        return self.shared.touch(key, self._shared_timeout(timeout), version)
+
+    def incr(self, key, delta=1, version=None):
+        local_key = self._local_key(key, version)
+        value = self.shared.incr(key, delta, version)
+        if local_key is not None:
+            self.local.discard(local_key)
+        return value
+
+    def delete(self, key, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            self.local.discard(local_key)
+        return self.shared.delete(key, version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            local_key = self._local_key(key, version)
+            if local_key is not None:
+                self.local.discard(local_key)
+        self.shared.delete_many(keys, version)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def _shared_timeout(self, timeout):
+        # Срок по умолчанию - TIMEOUT этого кэша, а не общего.
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
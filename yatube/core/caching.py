@@ -0,0 +1,83 @@
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+LOCK_KEY = '{}:lock'
+_MISSING = object()
+
+
+def get_or_refresh(key, compute, timeout, version=None):
+    """Значение из кэша с защитой от одновременного пересчёта.
+
+    - Пересчитывает один процесс: он берёт блокировку cache.add(), а
+      остальные тем временем получают прежнее значение (stale while
+      revalidate) - устаревшее по времени или по версии содержимого.
+      Прежнее значение хранится ещё CACHE_STALE_TIMEOUT после timeout.
+    - Незадолго до истечения значение с небольшой вероятностью
+      пересчитывается заранее (XFetch): чем дольше пересчёт и ближе
+      срок, тем вероятнее. Так срок не истекает у всех разом.
+    - Если значения нет совсем, остальные ждут пересчёта не дольше
+      CACHE_LOCK_WAIT секунд, а затем считают сами.
+
+    version - версия содержимого: значение с другой версией считается
+    устаревшим. timeout=0 отключает кэш, None - хранит без срока.
+    """
+    if timeout == 0:
+        return compute()
+    entry = cache.get(key)
+    if entry is not None:
+        value, entry_version, expires, duration = entry
+        if entry_version != version and hasattr(cache, 'get_shared'):
+            # Копия в памяти процесса (core.cache.TwoLevelCache) могла
+            # отстать: другой процесс уже положил новую версию в общий кэш.
+            entry = cache.get_shared(key) or entry
+            value, entry_version, expires, duration = entry
+        if entry_version == version and not _refresh_early(
+                expires, duration):
+            return value
+        if not cache.add(LOCK_KEY.format(key), 1,
+                         settings.CACHE_LOCK_TIMEOUT):
+            return value
+        return _rebuild(key, compute, timeout, version)
+    if cache.add(LOCK_KEY.format(key), 1, settings.CACHE_LOCK_TIMEOUT):
+        return _rebuild(key, compute, timeout, version)
+    value = _wait(key)
+    return compute() if value is _MISSING else value
+
+
+def _refresh_early(expires, duration):
+    # 1 - random() лежит в (0, 1]: логарифм всегда определён.
+    beta = settings.CACHE_EARLY_REFRESH_BETA
+    return (
+        time.time() - duration * beta * math.log(1 - random.random())
+        >= expires
+    )
+
+
+def _rebuild(key, compute, timeout, version):
+    try:
+        started = time.monotonic()
+        value = compute()
+        duration = time.monotonic() - started
+        if timeout is None:
+            expires, stored_for = math.inf, None
+        else:
+            expires = time.time() + timeout
+            stored_for = timeout + settings.CACHE_STALE_TIMEOUT
+        cache.set(key, (value, version, expires, duration), stored_for)
+        return value
+    finally:
+        cache.delete(LOCK_KEY.format(key))
+
+
+def _wait(key):
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    return _MISSING
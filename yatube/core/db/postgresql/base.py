@@ -0,0 +1,139 @@
+"""PostgreSQL с пулом соединений и проверкой соединений перед запросом.
+
+ENGINE 'core.db.postgresql'. Дополнительные ключи DATABASES:
+
+* CONN_HEALTH_CHECKS - перед первым запросом в каждом HTTP-запросе
+  сохранённое соединение (CONN_MAX_AGE) проверяется SELECT 1
+  и переоткрывается, если сервер его закрыл. В Django 4.0 этой
+  настройки ещё нет, здесь она повторяет поведение Django 4.1.
+* POOL - {'min_size': ..., 'max_size': ..., 'timeout': ...}: соединения
+  берутся из общего для процесса пула psycopg2 и возвращаются в него
+  вместо закрытия. Вместе с пулом CONN_MAX_AGE должен быть 0: соединение
+  возвращается в пул в конце каждого запроса. Если все соединения
+  заняты, поток ждёт до timeout секунд.
+"""
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import Error as DatabaseError
+from psycopg2.extras import register_default_jsonb
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """ThreadedConnectionPool, который ждёт свободное соединение.
+
+    Сам ThreadedConnectionPool при исчерпании сразу бросает PoolError,
+    здесь - только через timeout секунд.
+    """
+
+    def __init__(self, conn_params, min_size=1, max_size=10, timeout=10):
+        self.pool = ThreadedConnectionPool(min_size, max_size, **conn_params)
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.timeout = timeout
+
+    def getconn(self):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PoolError(
+                f'Нет свободного соединения в пуле за {self.timeout} с: '
+                f'увеличьте POOL max_size.')
+        try:
+            return self.pool.getconn()
+        except Exception:
+            self.slots.release()
+            raise
+
+    def putconn(self, connection, close=False):
+        try:
+            self.pool.putconn(connection, close=close)
+        finally:
+            self.slots.release()
+
+    def closeall(self):
+        self.pool.closeall()
+
+
+def get_pool(alias, conn_params, options):
+    # В ключе и параметры: у тестовой базы то же имя alias, но другое NAME.
+    key = (alias, repr(sorted(conn_params.items())))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(conn_params, **options)
+        return _pools[key]
+
+
+def close_pools():
+    """Закрывает все соединения всех пулов процесса."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
+
+
+def _is_alive(connection):
+    # Новое соединение psycopg2 не в autocommit: SELECT 1 открыл бы
+    # транзакцию, и connect() Django не смог бы включить autocommit.
+    # Соединение из пула свободно (putconn делает rollback), поэтому
+    # переключение допустимо.
+    try:
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except DatabaseError:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    health_check_done = False
+
+    @property
+    def pool_options(self):
+        return self.settings_dict.get('POOL')
+
+    def get_new_connection(self, conn_params):
+        if not self.pool_options:
+            return super().get_new_connection(conn_params)
+        self.pool = get_pool(self.alias, conn_params, self.pool_options)
+        connection = self.pool.getconn()
+        if not _is_alive(connection):
+            self.pool.putconn(connection, close=True)
+            connection = self.pool.getconn()
+        # Дальше - как у базового get_new_connection после connect().
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level', connection.isolation_level)
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+        return connection
+
+    def connect(self):
+        # До super().connect(): set_autocommit() внутри него вызывает
+        # ensure_connection(), и проверка SELECT 1 открыла бы транзакцию
+        # на только что открытом соединении.
+        self.health_check_done = True
+        super().connect()
+
+    def _close(self):
+        if self.connection is None or not self.pool_options:
+            return super()._close()
+        with self.wrap_database_errors:
+            self.pool.putconn(self.connection, close=self.connection.closed)
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def ensure_connection(self):
+        if (self.settings_dict.get('CONN_HEALTH_CHECKS')
+                and self.connection is not None
+                and not self.health_check_done
+                and not self.in_atomic_block):
+            if not self.is_usable():
+                self.close()
+            self.health_check_done = True
+        super().ensure_connection()
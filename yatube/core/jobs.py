@@ -0,0 +1,151 @@
+import logging
+import traceback
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def task(name, max_attempts=3, atomic=True):
+    """Регистрирует функцию как задачу очереди.
+
+    У функции появляется метод delay(*args, **kwargs), ставящий задачу
+    в очередь; аргументы должны сериализоваться в JSON. Задача
+    выполняется в транзакции; с atomic=False она сама управляет
+    транзакциями (например, фиксирует длинную работу пачками).
+    """
+    def decorator(func):
+        registry[name] = func
+        func.task_name = name
+        func.atomic = atomic
+
+        def delay(*args, unique=False, **kwargs):
+            return enqueue(
+                name, *args, unique=unique, max_attempts=max_attempts,
+                **kwargs)
+        func.delay = delay
+        return func
+    return decorator
+
+
+def enqueue(name, *args, unique=False, max_attempts=3, run_after=None,
+            **kwargs):
+    """Ставит задачу в очередь в текущей транзакции.
+
+    Задача видна обработчику только после фиксации транзакции. С unique
+    новая задача не создаётся, если такая же уже ждёт выполнения.
+    При JOBS_EAGER задача выполняется сразу после фиксации, без очереди.
+    """
+    if name not in registry:
+        raise KeyError(f'Неизвестная задача: {name}')
+    args = list(args)
+    if settings.JOBS_EAGER:
+        transaction.on_commit(lambda: _run_eager(name, args, kwargs))
+        return None
+    if unique and Job.objects.filter(
+            name=name, args=args, kwargs=kwargs, status=Job.PENDING,
+    ).exists():
+        return None
+    return Job.objects.create(
+        name=name, args=args, kwargs=kwargs, max_attempts=max_attempts,
+        run_after=run_after or timezone.now())
+
+
+def _run_eager(name, args, kwargs):
+    try:
+        registry[name](*args, **kwargs)
+    except Exception:
+        logger.exception('Задача %s завершилась с ошибкой', name)
+
+
+def schedule_periodic():
+    """Ставит периодические задачи из JOBS_PERIODIC, если их нет в очереди."""
+    now = timezone.now()
+    for name, interval in settings.JOBS_PERIODIC.items():
+        waiting = Job.objects.filter(
+            name=name, status__in=(Job.PENDING, Job.RUNNING)).exists()
+        if not waiting:
+            Job.objects.create(
+                name=name, run_after=now + timedelta(seconds=interval))
+
+
+def release_stale():
+    """Возвращает в очередь задачи, брошенные упавшим обработчиком."""
+    deadline = timezone.now() - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    return Job.objects.filter(
+        status=Job.RUNNING, locked_at__lt=deadline,
+    ).update(status=Job.PENDING, locked_at=None)
+
+
+def claim(limit=10):
+    """Забирает в работу до limit готовых задач.
+
+    Захват - условный UPDATE по статусу, поэтому несколько обработчиков
+    не возьмут одну задачу и без SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.PENDING, run_after__lte=now,
+    ).values_list('pk', flat=True)[:limit]
+    claimed = []
+    for pk in candidates:
+        taken = Job.objects.filter(pk=pk, status=Job.PENDING).update(
+            status=Job.RUNNING, locked_at=now, attempts=F('attempts') + 1)
+        if taken:
+            claimed.append(pk)
+    return list(Job.objects.filter(pk__in=claimed))
+
+
+def run_job(job):
+    """Выполняет задачу: успешная удаляется, упавшая ждёт повтора."""
+    func = registry.get(job.name)
+    try:
+        if func is None:
+            raise KeyError(f'Неизвестная задача: {job.name}')
+        with transaction.atomic() if func.atomic else nullcontext():
+            func(*job.args, **job.kwargs)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+            logger.error('Задача %s (%s) не выполнена', job.name, job.pk)
+        else:
+            job.status = Job.PENDING
+            job.run_after = timezone.now() + timedelta(
+                seconds=settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1))
+        job.locked_at = None
+        job.save(update_fields=[
+            'status', 'run_after', 'locked_at', 'last_error'])
+        return False
+    job.delete()
+    return True
+
+
+def run_pending(limit=10):
+    """Выполняет готовые задачи и возвращает число обработанных."""
+    release_stale()
+    jobs = claim(limit)
+    for job in jobs:
+        run_job(job)
+    return len(jobs)
+
+
+def queue_depth():
+    """Глубина очереди: число задач по статусам и возраст старейшей."""
+    stats = {status: 0 for status, _ in Job.STATUSES}
+    for row in Job.objects.values('status').annotate(total=Count('pk')):
+        stats[row['status']] = row['total']
+    oldest = Job.objects.filter(status=Job.PENDING).aggregate(
+        oldest=Min('run_after'))['oldest']
+    stats['oldest_pending_seconds'] = (
+        max((timezone.now() - oldest).total_seconds(), 0) if oldest else 0)
+    return stats
@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.profiling import CATEGORIES, collect, reset
+
+
+class Command(BaseCommand):
+    help = ('Сводка ProfilingMiddleware по представлениям: среднее время '
+            'запроса и его доли (база, шаблоны, кэш, Python). Сводки '
+            'процессов берутся из кэша, поэтому кэш должен быть общим.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json', action='store_true', help='Вывести сводку в JSON.')
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Сбросить накопленные сводки всех процессов.')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            reset()
+            self.stdout.write('Сводки сброшены')
+            return
+        summary = collect()
+        if options['json']:
+            self.stdout.write(
+                json.dumps(summary, ensure_ascii=False, indent=2))
+            return
+        if not summary:
+            self.stdout.write('Данных нет: PROFILING_SAMPLE_RATE = 0 '
+                              'или кэш не общий для процессов.')
+            return
+        columns = ('wall', *CATEGORIES, 'python')
+        self.stdout.write(
+            f'{"представление":<28}{"запр.":>7}{"sql":>6}'
+            + ''.join(f'{column:>10}' for column in columns))
+        for view_name, stats in summary.items():
+            self.stdout.write(
+                f'{view_name:<28}{stats["requests"]:>7}'
+                f'{stats["queries"]:>6}'
+                + ''.join(
+                    f'{stats[f"{column}_ms"]:>10.2f}' for column in columns))
@@ -0,0 +1,48 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.jobs import queue_depth, run_pending, schedule_periodic
+
+
+class Command(BaseCommand):
+    help = 'Фоновый обработчик очереди задач (core.Job).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.')
+        parser.add_argument(
+            '--batch', type=int, default=10,
+            help='Сколько задач забирать за один проход.')
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.')
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Показать глубину очереди и завершиться.')
+        parser.add_argument(
+            '--stats-every', type=float, default=60.0,
+            help='Как часто (в секундах) писать глубину очереди в вывод.')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(queue_depth()))
+            return
+        reported = 0.0
+        try:
+            while True:
+                schedule_periodic()
+                processed = run_pending(options['batch'])
+                now = time.monotonic()
+                if now - reported >= options['stats_every']:
+                    self.stdout.write(json.dumps(queue_depth()))
+                    reported = now
+                if processed:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            self.stdout.write('Обработчик остановлен')
@@ -0,0 +1,31 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную базу SQLite в файлы реплик DATABASE_REPLICAS: '
+            'ручная «репликация» для проверки чтения с реплик локально. '
+            'Реплики PostgreSQL обновляет сам сервер.')
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        if not settings.DATABASE_REPLICAS:
+            self.stdout.write('Реплики не настроены (DB_REPLICAS).')
+            return
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            self.stdout.write('Реплики обновляются репликацией сервера.')
+            return
+        source = sqlite3.connect(primary['NAME'])
+        try:
+            for alias in settings.DATABASE_REPLICAS:
+                target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: скопировано')
+        finally:
+            source.close()
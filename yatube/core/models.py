@@ -0,0 +1,40 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Отложенная задача для фонового обработчика (manage.py run_jobs)."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=100)
+    args = models.JSONField('Аргументы', default=list, blank=True)
+    kwargs = models.JSONField('Именованные аргументы', default=dict,
+                              blank=True)
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток', default=3)
+    run_after = models.DateTimeField('Выполнить после', default=timezone.now)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ['run_after']
+        indexes = [
+            models.Index(
+                fields=['status', 'run_after'], name='job_status_run_idx'),
+        ]
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+
+    def __str__(self) -> str:
+        return f'{self.name} ({self.get_status_display()})'
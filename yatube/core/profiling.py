@@ -0,0 +1,234 @@
+import copy
+import functools
+import os
+import random
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.base import Template
+
+# Части времени запроса, которые считаются отдельно; остальное - Python.
+CATEGORIES = ('db', 'template', 'cache')
+CACHE_METHODS = (
+    'get', 'set', 'add', 'delete', 'touch', 'incr', 'decr', 'has_key',
+    'get_many', 'set_many', 'delete_many', 'get_or_set', 'clear',
+)
+UNRESOLVED = '<unresolved>'
+
+SNAPSHOT_KEY = 'profiling:snapshot:{}'
+PROCESSES_KEY = 'profiling:processes'
+GENERATION_KEY = 'profiling:generation'
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+_local = threading.local()
+_lock = threading.Lock()
+# Сводка процесса: имя представления -> суммы по запросам (секунды).
+_stats = {}
+_state = {'generation': None, 'published': 0.0, 'installed': False}
+
+
+class Profile:
+    """Время одного запроса по частям.
+
+    Части вкладываются друг в друга (запрос к базе из шаблона, шаблон
+    внутри {% cache %}), поэтому каждой части засчитывается только её
+    собственное время, без вложенных.
+    """
+
+    def __init__(self):
+        self.totals = dict.fromkeys(CATEGORIES, 0.0)
+        self.queries = 0
+        self.stack = []
+
+    def enter(self, category):
+        self.stack.append([category, time.perf_counter(), 0.0])
+
+    def exit(self):
+        category, started, nested = self.stack.pop()
+        elapsed = time.perf_counter() - started
+        self.totals[category] += elapsed - nested
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+
+@contextmanager
+def measured(category):
+    profile = getattr(_local, 'profile', None)
+    if profile is None:
+        yield
+        return
+    profile.enter(category)
+    try:
+        yield
+    finally:
+        profile.exit()
+
+
+def _instrument(cls, name, category):
+    original = getattr(cls, name, None)
+    if original is None or getattr(original, 'profiled', False):
+        return
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        with measured(category):
+            return original(*args, **kwargs)
+
+    wrapper.profiled = True
+    setattr(cls, name, wrapper)
+
+
+def _timed_execute(execute, sql, params, many, context):
+    profile = getattr(_local, 'profile', None)
+    if profile is None:
+        return execute(sql, params, many, context)
+    profile.queries += 1
+    with measured('db'):
+        return execute(sql, params, many, context)
+
+
+def install():
+    """Оборачивает отрисовку шаблонов и методы бэкендов кэша.
+
+    Обёртки без профилируемого запроса в потоке сразу вызывают исходный
+    метод, поэтому на запросы вне выборки почти не влияют.
+    """
+    if _state['installed']:
+        return
+    _instrument(Template, '_render', 'template')
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        for name in CACHE_METHODS:
+            _instrument(backend, name, 'cache')
+    _state['generation'] = cache.get(GENERATION_KEY)
+    _state['installed'] = True
+
+
+def record(view_name, wall, profile):
+    with _lock:
+        stats = _stats.setdefault(view_name, {
+            'requests': 0, 'wall': 0.0, 'max_wall': 0.0, 'queries': 0,
+            **dict.fromkeys(CATEGORIES, 0.0),
+        })
+        stats['requests'] += 1
+        stats['wall'] += wall
+        stats['max_wall'] = max(stats['max_wall'], wall)
+        stats['queries'] += profile.queries
+        for category in CATEGORIES:
+            stats[category] += profile.totals[category]
+
+
+def publish(force=False):
+    """Кладёт сводку процесса в кэш, где её видят другие процессы.
+
+    Сводка в памяти у каждого процесса своя; общая картина собирается
+    из кэша, если он общий (файловый, БД, memcached). Со сбросом
+    (reset) сменяется поколение, и процесс очищает свою сводку.
+    """
+    now = time.monotonic()
+    if not force and (
+            now - _state['published'] < settings.PROFILING_PUBLISH_INTERVAL):
+        return
+    _state['published'] = now
+    generation = cache.get(GENERATION_KEY)
+    with _lock:
+        if generation != _state['generation']:
+            _stats.clear()
+            _state['generation'] = generation
+        snapshot = copy.deepcopy(_stats)
+    pid = os.getpid()
+    cache.set(SNAPSHOT_KEY.format(pid), snapshot, SNAPSHOT_TIMEOUT)
+    processes = cache.get(PROCESSES_KEY) or set()
+    if pid not in processes:
+        cache.set(PROCESSES_KEY, processes | {pid}, SNAPSHOT_TIMEOUT)
+
+
+def reset():
+    """Сбрасывает сводки всех процессов."""
+    processes = cache.get(PROCESSES_KEY) or set()
+    cache.delete_many(
+        [SNAPSHOT_KEY.format(pid) for pid in processes] + [PROCESSES_KEY])
+    cache.set(GENERATION_KEY, time.time_ns(), None)
+    with _lock:
+        _stats.clear()
+        _state['generation'] = cache.get(GENERATION_KEY)
+
+
+def collect():
+    """Сводка по представлениям со всех процессов, самые затратные первыми.
+
+    Для каждого представления: число запросов, среднее время (всего
+    и по частям) в миллисекундах, среднее число запросов к базе,
+    максимальное время и суммарное время, по которому идёт сортировка.
+    """
+    processes = cache.get(PROCESSES_KEY) or set()
+    snapshots = cache.get_many(
+        [SNAPSHOT_KEY.format(pid) for pid in processes])
+    with _lock:
+        snapshots[SNAPSHOT_KEY.format(os.getpid())] = copy.deepcopy(_stats)
+    merged = {}
+    for snapshot in snapshots.values():
+        for view_name, stats in snapshot.items():
+            total = merged.setdefault(view_name, dict.fromkeys(stats, 0))
+            for field, value in stats.items():
+                if field == 'max_wall':
+                    total[field] = max(total[field], value)
+                else:
+                    total[field] += value
+    summary = {}
+    for view_name, stats in sorted(
+            merged.items(), key=lambda item: -item[1]['wall']):
+        requests = stats['requests']
+        python = stats['wall'] - sum(stats[part] for part in CATEGORIES)
+        summary[view_name] = {
+            'requests': requests,
+            'total_ms': round(stats['wall'] * 1000, 2),
+            'wall_ms': round(stats['wall'] * 1000 / requests, 2),
+            **{
+                f'{part}_ms': round(stats[part] * 1000 / requests, 2)
+                for part in CATEGORIES
+            },
+            'python_ms': round(max(python, 0) * 1000 / requests, 2),
+            'queries': round(stats['queries'] / requests, 1),
+            'max_wall_ms': round(stats['max_wall'] * 1000, 2),
+        }
+    return summary
+
+
+class ProfilingMiddleware:
+    """Выборочно профилирует запросы и копит сводку по представлениям.
+
+    Профилируется доля запросов PROFILING_SAMPLE_RATE; при 0 middleware
+    отключается. Для потоковых ответов учитывается время до начала
+    отдачи.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install()
+
+    def __call__(self, request):
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+        profile = _local.profile = Profile()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(_timed_execute))
+                response = self.get_response(request)
+        finally:
+            _local.profile = None
+        wall = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        record(match.view_name if match else UNRESOLVED, wall, profile)
+        publish()
+        return response
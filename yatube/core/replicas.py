@@ -0,0 +1,91 @@
+"""Чтение с реплик базы и привязка к основной базе после записи.
+
+Реплики - псевдонимы из DATABASE_REPLICAS. С них читают только запросы,
+пропущенные ReplicaMiddleware: GET и HEAD без записи в том же браузере
+за последние REPLICA_PIN_SECONDS секунд. Так пользователь сразу видит
+свой пост, комментарий или подписку, даже если реплика отстаёт.
+Команды, задачи и тесты идут мимо middleware и работают с основной
+базой.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'db_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Таблица DatabaseCache: кэш на реплике отставал бы от записей в него.
+CACHE_APP_LABEL = 'django_cache'
+
+
+class RequestState:
+    """Реплика запроса (None - основная база) и была ли запись."""
+
+    def __init__(self, replica=None):
+        self.replica = replica
+        self.wrote = False
+
+
+# contextvars, а не threading.local: состояние переходит в потоки
+# sync_to_async у асинхронных представлений.
+_state = ContextVar('replica_state', default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (state is None or state.replica is None or state.wrote
+                or model._meta.app_label == CACHE_APP_LABEL
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        # Запись в кэш - не изменение данных, привязка к основной базе
+        # после неё не нужна.
+        if state is not None and model._meta.app_label != CACHE_APP_LABEL:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """Выбирает реплику для чтения и ставит cookie привязки после записи.
+
+    Запись отмечает сам роутер (db_for_write), поэтому привязка
+    срабатывает и после записи из GET, например подписки по ссылке.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RequestState()
+        if (request.method in SAFE_METHODS
+                and PIN_COOKIE not in request.COOKIES):
+            state.replica = random.choice(settings.DATABASE_REPLICAS)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax')
+        return response
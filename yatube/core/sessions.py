@@ -0,0 +1,61 @@
+"""SessionMiddleware, который не трогает сессии анонимных читателей лент.
+
+Запрос без cookie сессии к представлению из SESSIONLESS_VIEWS получает
+пустую сессию NoSession: хранилище (SESSION_ENGINE) не создаётся,
+ничего не читается и не сохраняется, cookie сессии не ставится.
+request.user у такого запроса - AnonymousUser. Остальные запросы
+обрабатываются как в django.contrib.sessions.
+"""
+from django.conf import settings
+from django.contrib.sessions.backends.base import SessionBase
+from django.contrib.sessions.middleware import \
+    SessionMiddleware as BaseSessionMiddleware
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class NoSession(SessionBase):
+    """Всегда пустая сессия без хранилища; записи в неё теряются."""
+
+    def load(self):
+        return {}
+
+    def exists(self, session_key):
+        return False
+
+    def create(self):
+        pass
+
+    def save(self, must_create=False):
+        pass
+
+    def delete(self, session_key=None):
+        pass
+
+
+def is_sessionless(request):
+    if (request.method not in SAFE_METHODS
+            or settings.SESSION_COOKIE_NAME in request.COOKIES):
+        return False
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return False
+    return match.view_name in settings.SESSIONLESS_VIEWS
+
+
+class SessionMiddleware(BaseSessionMiddleware):
+    def process_request(self, request):
+        if is_sessionless(request):
+            request.session = NoSession()
+            return
+        super().process_request(request)
+
+    def process_response(self, request, response):
+        if isinstance(getattr(request, 'session', None), NoSession):
+            # Вошедший пользователь с cookie получит другую страницу.
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,31 @@
+"""Настройка соединений SQLite через PRAGMA из SQLITE_PRAGMAS.
+
+WAL позволяет читать во время записи, synchronous=NORMAL в режиме WAL
+не теряет согласованность и не ждёт fsync на каждой фиксации,
+busy_timeout заставляет писателей ждать блокировку, а не сразу падать
+с «database is locked».
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# busy_timeout первым: переход в WAL тоже ждёт блокировку.
+PRAGMA_ORDER = ('busy_timeout', 'journal_mode')
+
+
+def pragma_statements(pragmas):
+    ordered = sorted(
+        pragmas,
+        key=lambda name: (
+            PRAGMA_ORDER.index(name) if name in PRAGMA_ORDER
+            else len(PRAGMA_ORDER)))
+    return [f'PRAGMA {name} = {pragmas[name]}' for name in ordered]
+
+
+@receiver(connection_created)
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(settings.SQLITE_PRAGMAS):
+            cursor.execute(statement)
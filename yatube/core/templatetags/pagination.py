@@ -0,0 +1,17 @@
+from django import template
+from django.conf import settings
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_window(page_obj, on_each_side=None):
+    """Номера страниц для вывода: первая, последняя и соседи текущей.
+
+    Пропуски обозначаются Paginator.ELLIPSIS, поэтому число ссылок
+    не зависит от числа страниц.
+    """
+    if on_each_side is None:
+        on_each_side = settings.PAGINATOR_WINDOW
+    return list(page_obj.paginator.get_elided_page_range(
+        page_obj.number, on_each_side=on_each_side, on_ends=1))
@@ -0,0 +1,59 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+
+from core.caching import get_or_refresh
+
+register = template.Library()
+
+
+class StampedeCacheNode(template.Node):
+    def __init__(self, nodelist, timeout, fragment_name, vary_on, version):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+        self.version = version
+
+    def render(self, context):
+        timeout = self.timeout.resolve(context)
+        if timeout is not None and not isinstance(timeout, int):
+            try:
+                timeout = int(timeout)
+            except (ValueError, TypeError):
+                raise template.TemplateSyntaxError(
+                    f'"stampede_cache": неверный срок "{timeout}"')
+        key = make_template_fragment_key(
+            self.fragment_name,
+            [var.resolve(context) for var in self.vary_on])
+        version = self.version.resolve(context) if self.version else None
+        return get_or_refresh(
+            key, lambda: self.nodelist.render(context), timeout, version)
+
+
+@register.tag('stampede_cache')
+def do_stampede_cache(parser, token):
+    """Как {% cache %}, но через core.caching.get_or_refresh.
+
+        {% stampede_cache timeout name [vary_on ...] [version=expr] %}
+            ...
+        {% endstampede_cache %}
+
+    Фрагмент с другой версией не выбрасывается, а отдаётся остальным
+    запросам, пока один из них его пересчитывает.
+    """
+    nodelist = parser.parse(('endstampede_cache',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    version = None
+    if bits[-1].startswith('version='):
+        version = parser.compile_filter(bits.pop()[len('version='):])
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f'"{bits[0]}" принимает не меньше двух аргументов.')
+    return StampedeCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        bits[2],
+        [parser.compile_filter(bit) for bit in bits[3:]],
+        version,
+    )
@@ -1,5 +1,12 @@
+import os
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render
 
+from .profiling import collect
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -15,3 +22,16 @@ def csrf_error(request, exections):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+@staff_member_required
+def profiling_stats(request):
+    """Сводка ProfilingMiddleware по представлениям в JSON."""
+    return JsonResponse(
+        {
+            'pid': os.getpid(),
+            'sample_rate': settings.PROFILING_SAMPLE_RATE,
+            'views': collect(),
+        },
+        json_dumps_params={'ensure_ascii': False, 'indent': 2},
+    )
@@ -1,15 +1,23 @@
 from django.contrib import admin
 
-from .models import Post, Group, Comment, Follow
+from .models import Post, Group, Comment, Follow, Profile
+from .search import filter_posts
 
 
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
+    list_display = (
+        'pk', 'text', 'pub_date', 'author', 'group', 'comments_count',)
     search_fields = ('text',)
     list_filter = ('pub_date',)
     list_editable = ('group',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по тексту идёт через полнотекстовый индекс, а не LIKE.
+        if not search_term:
+            return queryset, False
+        return filter_posts(queryset, search_term), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('pk', 'title', 'slug', 'description',)
@@ -30,7 +38,15 @@ class FollowAdmin(admin.ModelAdmin):
     search_fields = ('user', 'author',)
 
 
+class ProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        'user', 'posts_count', 'followers_count', 'following_count',)
+    search_fields = ('user__username',)
+    readonly_fields = ('posts_count', 'followers_count', 'following_count',)
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Follow, FollowAdmin)
+admin.site.register(Profile, ProfileAdmin)
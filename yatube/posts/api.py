@@ -0,0 +1,140 @@
+"""JSON API только для чтения: ленты, пост и комментарии.
+
+Строки выбираются через .values() без создания объектов моделей
+и сразу сериализуются в компактный JSON, без шаблонов. Постраничный
+вывод - по курсору (?after=, ?before=), ETag и Last-Modified - те же,
+что у HTML-страниц (posts.conditional).
+"""
+import json
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+from .conditional import (conditional, follow_scopes, found, group_scopes,
+                          index_scopes, post_scopes, profile_scopes)
+from .models import Comment, Post
+from .paginator import CursorPaginator
+from .timeline import follow_feed
+
+# Имя в ответе -> поле для .values().
+FEED_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+    'thumbnails': 'thumbnails',
+}
+# Число комментариев - только у отдельного поста: комментарий сдвигает
+# версию post:<id>, но не версии лент, и ETag ленты со счётчиком
+# отдавал бы 304 с устаревшим значением.
+POST_FIELDS = {**FEED_FIELDS, 'comments_count': 'comments_count'}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'created': 'created',
+    'author': 'author__username',
+}
+
+
+def json_response(data, status=200):
+    return HttpResponse(
+        json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False,
+                   separators=(',', ':')),
+        content_type='application/json', status=status)
+
+
+def not_found():
+    return json_response({'detail': 'Не найдено.'}, status=404)
+
+
+def page_size(request, default):
+    try:
+        size = int(request.GET.get('limit', default))
+    except ValueError:
+        size = default
+    return min(max(size, 1), settings.API_MAX_PAGE_SIZE)
+
+
+def _post(row, fields=POST_FIELDS):
+    post = {name: row[field] for name, field in fields.items()}
+    if post['image']:
+        post['image'] = default_storage.url(post['image'])
+    return post
+
+
+def _comment(row):
+    return {name: row[field] for name, field in COMMENT_FIELDS.items()}
+
+
+def feed_page(request, post_list, cursor_fields=('pub_date', 'pk')):
+    """Страница ленты по курсору из словарей .values()."""
+    paginator = CursorPaginator(
+        post_list.values(*FEED_FIELDS.values()),
+        page_size(request, settings.POSTS_IN_PAGE), cursor_fields)
+    page = paginator.get_page(
+        after=request.GET.get('after'), before=request.GET.get('before'))
+    return json_response({
+        'results': [_post(row, FEED_FIELDS) for row in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
+
+
+@conditional(index_scopes)
+def index(request):
+    return feed_page(request, Post.objects.all())
+
+
+@conditional(group_scopes)
+def group_posts(request, slug):
+    if not found(request):
+        return not_found()
+    return feed_page(request, Post.objects.filter(group__slug=slug))
+
+
+@conditional(profile_scopes)
+def profile_posts(request, username):
+    if not found(request):
+        return not_found()
+    return feed_page(request, Post.objects.filter(author__username=username))
+
+
+@conditional(follow_scopes)
+def follow_posts(request):
+    if not found(request):
+        return json_response(
+            {'detail': 'Нужна авторизация.'}, status=401)
+    post_list, cursor_fields = follow_feed(request.user)
+    return feed_page(request, post_list, cursor_fields)
+
+
+@conditional(post_scopes)
+def post_detail(request, post_id):
+    row = (
+        Post.objects.filter(pk=post_id)
+        .values(*POST_FIELDS.values()).first())
+    if row is None:
+        return not_found()
+    return json_response(_post(row))
+
+
+@conditional(post_scopes)
+def post_comments(request, post_id):
+    if not found(request):
+        return not_found()
+    paginator = CursorPaginator(
+        Comment.objects.filter(post_id=post_id)
+        .values(*COMMENT_FIELDS.values()),
+        page_size(request, settings.COMMENTS_PER_PAGE),
+        fields=('created', 'pk'), date_attr='created')
+    page = paginator.get_page(
+        after=request.GET.get('after'), before=request.GET.get('before'))
+    return json_response({
+        'results': [_comment(row) for row in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
@@ -0,0 +1,127 @@
+"""Асинхронные варианты лент и страницы поста для работы под ASGI.
+
+В Django 4.0 нет асинхронного ORM, поэтому каждый запрос к базе или
+кэшу выполняется в потоке (in_thread), а независимые запросы
+собираются в asyncio.gather и идут параллельно. Пока они ждут, поток
+цикла событий обслуживает другие запросы. Шаблон отрисовывается тоже
+в потоке: лента в нём выбирается лениво, только при промахе кэша.
+Включаются настройкой ASYNC_FEED_VIEWS (см. posts.urls).
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.db import close_old_connections
+from django.shortcuts import get_object_or_404, render
+
+from .caching import feed_version
+from .conditional import (aconditional, group_scopes, index_scopes,
+                          post_scopes, profile_scopes)
+from .counters import get_profile
+from .forms import CommentForm
+from .models import Follow, Group, Post, User
+from .timeline import follow_feed
+from .views import comment_page, feed_context
+
+
+def in_thread(func, *args, **kwargs):
+    """Выполняет синхронный вызов в отдельном потоке.
+
+    У каждого потока своё соединение с базой, поэтому вызовы из
+    asyncio.gather не ждут друг друга. После вызова соединение
+    закрывается, если оно устарело (CONN_MAX_AGE), как в конце запроса.
+    """
+    def call():
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(call, thread_sensitive=False)()
+
+
+def is_following(user, username):
+    return user.is_authenticated and Follow.objects.filter(
+        user=user, author__username=username).exists()
+
+
+def render_feed(request, template, post_list, feed, version, extra=None,
+                cursor_fields=('pub_date', 'pk')):
+    context = feed_context(request, post_list, feed, version, cursor_fields)
+    return render(request, template, {**(extra or {}), **context})
+
+
+@aconditional(index_scopes)
+async def index(request):
+    version = await in_thread(feed_version, 'posts')
+    return await in_thread(
+        render_feed, request, 'posts/index.html',
+        Post.objects.for_feed(), 'index', version)
+
+
+@aconditional(group_scopes)
+async def group_post(request, slug):
+    group = await in_thread(get_object_or_404, Group, slug=slug)
+    version = await in_thread(feed_version, f'group:{group.pk}')
+    return await in_thread(
+        render_feed, request, 'posts/group_list.html',
+        group.posts.for_feed(), f'group:{group.slug}', version,
+        {'group': group})
+
+
+@aconditional(profile_scopes)
+async def profile(request, username):
+    author, following = await asyncio.gather(
+        in_thread(
+            get_object_or_404,
+            User.objects.select_related('profile'), username=username),
+        in_thread(is_following, request.user, username),
+    )
+    author_profile, version = await asyncio.gather(
+        in_thread(get_profile, author),
+        in_thread(feed_version, f'author:{author.pk}'),
+    )
+    return await in_thread(
+        render_feed, request, 'posts/profile.html',
+        author.posts.for_feed(), f'profile:{author.pk}', version,
+        {
+            'post_count': author_profile.posts_count,
+            'author_profile': author_profile,
+            'author': author,
+            'following': following,
+        })
+
+
+@aconditional(post_scopes)
+async def post_detail(request, post_id):
+    post, comments = await asyncio.gather(
+        in_thread(
+            get_object_or_404,
+            Post.objects.select_related('author__profile', 'group'),
+            id=post_id),
+        in_thread(comment_page, request, post_id),
+    )
+    author_profile = await in_thread(get_profile, post.author)
+    context = {
+        'post_count': author_profile.posts_count,
+        'post': post,
+        'form': CommentForm(request.POST or None),
+        'comments': comments,
+    }
+    return await in_thread(
+        render, request, 'posts/post_detail.html', context)
+
+
+async def follow_index(request):
+    # Ленивый request.user читает сессию и базу: только в потоке.
+    if not await in_thread(lambda: request.user.is_authenticated):
+        return redirect_to_login(request.get_full_path())
+    user = request.user
+    feed = f'follow:{user.pk}'
+    (post_list, cursor_fields), version = await asyncio.gather(
+        in_thread(follow_feed, user),
+        in_thread(feed_version, 'posts', feed),
+    )
+    return await in_thread(
+        render_feed, request, 'posts/follow.html', post_list, feed,
+        version, cursor_fields=cursor_fields)
@@ -0,0 +1,206 @@
+import math
+import statistics
+import time
+from contextlib import contextmanager
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.backends.utils import CursorWrapper
+from django.template.base import Template
+from django.test import Client
+from django.urls import reverse
+
+from .models import Comment, Follow, Group, Post, User
+
+# Модули маршрутов, которые проходит нагрузочная проверка.
+URL_MODULES = ('posts.urls', 'posts.api_urls', 'users.urls', 'about.urls')
+# Показатели маршрута, на которые можно задать бюджет.
+METRICS = ('queries', 'sql_ms', 'template_ms', 'p50_ms', 'p95_ms')
+
+
+def percentile(values, percent):
+    """Перцентиль по ближайшему рангу: значение, не меньше которого
+    percent процентов измерений.
+    """
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+@contextmanager
+def query_timer(timings):
+    """Собирает время выполнения каждого SQL-запроса в секундах.
+
+    connection.queries округляет время до миллисекунды, а запросы
+    к SQLite часто выполняются быстрее.
+    """
+    def timed_execute(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            timings.append(time.perf_counter() - started)
+
+    with connection.execute_wrapper(timed_execute):
+        yield timings
+
+
+@contextmanager
+def template_timer(timings):
+    """Собирает время отрисовки шаблонов верхнего уровня в секундах.
+
+    Вложенные шаблоны ({% extends %}, {% include %}) входят во время
+    внешнего и отдельно не считаются.
+    """
+    original = Template._render
+    depth = 0
+
+    def timed_render(self, context):
+        nonlocal depth
+        depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            depth -= 1
+            if not depth:
+                timings.append(time.perf_counter() - started)
+
+    Template._render = timed_render
+    try:
+        yield timings
+    finally:
+        Template._render = original
+
+
+@contextmanager
+def db_latency(seconds):
+    """Добавляет задержку к каждому SQL-запросу во всех потоках.
+
+    Так на локальной SQLite моделируется база на другой машине, где
+    поток в основном ждёт ответа сети.
+    """
+    original = CursorWrapper._execute_with_wrappers
+
+    def slow_execute(self, *args, **kwargs):
+        time.sleep(seconds)
+        return original(self, *args, **kwargs)
+
+    CursorWrapper._execute_with_wrappers = slow_execute
+    try:
+        yield
+    finally:
+        CursorWrapper._execute_with_wrappers = original
+
+
+def route_kwargs(user):
+    """Значения параметров маршрутов из данных в базе.
+
+    Пост берётся у самого пользователя, чтобы редактирование открывалось,
+    автор - из его подписок, группа - первая, в которой есть посты.
+    """
+    post = (
+        Post.objects.filter(author=user).order_by('-comments_count').first()
+        or Post.objects.order_by('-comments_count').first()
+    )
+    follow = Follow.objects.filter(user=user).first()
+    author = follow.author if follow else post.author
+    group = (
+        Group.objects.filter(posts__isnull=False).order_by('pk').first()
+        or Group.objects.first()
+    )
+    return {
+        'post_id': post.pk,
+        'username': author.username,
+        'slug': group.slug if group else None,
+        'kind': 'posts',
+    }
+
+
+def collect_routes(user):
+    """Список (имя маршрута, URL) для всех маршрутов из URL_MODULES."""
+    values = route_kwargs(user)
+    routes = []
+    for module_name in URL_MODULES:
+        module = import_module(module_name)
+        for pattern in module.urlpatterns:
+            name = f'{module.app_name}:{pattern.name}'
+            kwargs = {
+                key: values[key] for key in pattern.pattern.converters
+            }
+            routes.append((name, reverse(name, kwargs=kwargs)))
+    return routes
+
+
+def measure(client, url, user, repeat, cold=False):
+    """Запрашивает url repeat раз и возвращает показатели маршрута.
+
+    Первый запрос прогревает кэши и в замеры не входит. Вход
+    выполняется перед каждым запросом, вне замера: маршрут выхода
+    завершает сессию.
+    """
+    latencies, sql_times, template_times, queries = [], [], [], []
+    status = None
+    for attempt in range(repeat + 1):
+        client.force_login(user)
+        if cold:
+            cache.clear()
+        executed, rendered = [], []
+        with query_timer(executed), template_timer(rendered):
+            started = time.perf_counter()
+            response = client.get(url)
+            elapsed = time.perf_counter() - started
+        status = response.status_code
+        if not attempt:
+            continue
+        latencies.append(elapsed * 1000)
+        queries.append(len(executed))
+        sql_times.append(sum(executed) * 1000)
+        template_times.append(sum(rendered) * 1000)
+    return {
+        'status': status,
+        'queries': max(queries),
+        'sql_ms': round(statistics.median(sql_times), 2),
+        'template_ms': round(statistics.median(template_times), 2),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+    }
+
+
+def bench_routes(user, repeat=20, cold=False):
+    """Показатели всех маршрутов для запросов от имени user."""
+    client = Client()
+    return [
+        {'route': name, 'url': url,
+         **measure(client, url, user, repeat, cold)}
+        for name, url in collect_routes(user)
+    ]
+
+
+def check_budget(results, budgets=None):
+    """Сравнивает показатели с бюджетом и возвращает превышения.
+
+    Бюджет - словарь {маршрут: {показатель: предел}}; ключ '*' задаёт
+    пределы для всех маршрутов, именованные ключи их дополняют.
+    Результат: список кортежей (маршрут, показатель, значение, предел).
+    """
+    budgets = settings.BENCH_URL_BUDGETS if budgets is None else budgets
+    exceeded = []
+    for result in results:
+        limits = {**budgets.get('*', {}), **budgets.get(result['route'], {})}
+        for metric in METRICS:
+            limit = limits.get(metric)
+            if limit is not None and result[metric] > limit:
+                exceeded.append(
+                    (result['route'], metric, result[metric], limit))
+    return exceeded
+
+
+def data_volume():
+    """Объём данных, на которых сняты показатели."""
+    return {
+        model._meta.model_name: model.objects.count()
+        for model in (User, Group, Post, Comment, Follow)
+    }
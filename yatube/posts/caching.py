@@ -0,0 +1,90 @@
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+
+VERSION_KEY = 'feed-version:{}'
+CHANGED_KEY = 'feed-changed:{}'
+PAGE_PARAMS = ('page', 'after', 'before')
+
+
+def _initial_version():
+    # Версия, созданная заново после вытеснения из кэша, не должна совпасть
+    # с прежней, иначе снова найдутся старые фрагменты с тем же ключом.
+    return time.time_ns()
+
+
+def get_versions(*scopes):
+    """Возвращает текущие версии содержимого для перечисленных областей."""
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(scope):
+    """Сдвигает версию области: все фрагменты с ней перестают находиться."""
+    key = VERSION_KEY.format(scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), None)
+    cache.set(CHANGED_KEY.format(scope), time.time(), None)
+
+
+def last_changed(*scopes):
+    """Время последнего изменения областей (datetime в UTC).
+
+    Если отметка вытеснена из кэша, изменением считается текущий момент:
+    лишний полный ответ лучше устаревшего 304.
+    """
+    keys = [CHANGED_KEY.format(scope) for scope in scopes]
+    changed = cache.get_many(keys)
+    now = time.time()
+    missing = {key: now for key in keys if key not in changed}
+    if missing:
+        cache.set_many(missing, None)
+    latest = max([*changed.values(), *missing.values()], default=now)
+    return datetime.fromtimestamp(latest, timezone.utc)
+
+
+def bump_post_versions(post, *group_ids):
+    """Сдвигает версии всех лент, в которые попадает пост."""
+    bump_version('posts')
+    bump_version(f'post:{post.pk}')
+    bump_version(f'author:{post.author_id}')
+    for group_id in {post.group_id, *group_ids} - {None}:
+        bump_version(f'group:{group_id}')
+
+
+def feed_version(*scopes):
+    """Версия содержимого ленты из версий её областей.
+
+    Области (scopes) перечисляют, от чего зависит лента: 'posts' - любой
+    пост, 'group:<id>', 'author:<id>' - посты группы или автора,
+    'follow:<id>' - подписки пользователя, 'followers:<id>' - подписчики
+    автора, 'post:<id>' - пост и его комментарии.
+    """
+    return '.'.join(str(version) for version in get_versions(*scopes))
+
+
+def feed_cache_key(request, feed):
+    """Ключ фрагмента ленты: лента и страница или курсор.
+
+    Версия содержимого (feed_version) в ключ не входит, а хранится рядом
+    со значением: пока фрагмент пересчитывается после изменения, другие
+    запросы получают прежний (см. core.caching.get_or_refresh).
+    """
+    position = ','.join(
+        f'{param}={request.GET[param]}'
+        for param in PAGE_PARAMS if request.GET.get(param)
+    )
+    return f'{feed}:{position}'
+
+
+def feed_count_key(feed):
+    """Ключ числа постов в ленте; версия - как у фрагмента."""
+    return f'count:{feed}'
@@ -0,0 +1,130 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+from .caching import feed_version, last_changed
+from .models import Group, Post, User
+
+
+def _validators(request, scopes, published=None):
+    """ETag и Last-Modified страницы по версиям её областей.
+
+    В ETag входят адрес с параметрами и пользователь: шапка, кнопка
+    подписки и форма комментария у каждого свои. Last-Modified - время
+    последнего сдвига версий (новый пост, правка, комментарий,
+    подписка), но не раньше даты публикации.
+    """
+    user = request.user.pk if request.user.is_authenticated else 'anon'
+    raw = f'{request.get_full_path()}|{user}|{feed_version(*scopes)}'
+    modified = last_changed(*scopes)
+    if published is not None:
+        modified = max(modified, published)
+    return hashlib.md5(raw.encode()).hexdigest(), modified
+
+
+def page_validators(page_scopes, request, *args, **kwargs):
+    """ETag и Last-Modified запроса; считаются один раз на запрос."""
+    if not hasattr(request, '_validators'):
+        state = page_scopes(request, *args, **kwargs)
+        request._validators = (
+            _validators(request, *state) if state else (None, None))
+    return request._validators
+
+
+def conditional(page_scopes):
+    """Отвечает 304, если страница не менялась с прошлого запроса клиента.
+
+    page_scopes(request, **kwargs) возвращает области, от которых
+    зависит страница, и дату публикации (или None), либо None, если
+    объекта нет - тогда запрос обрабатывается как обычно. Проверка
+    обходится без запроса ленты и отрисовки шаблона.
+    """
+    return condition(
+        etag_func=lambda request, *args, **kwargs: page_validators(
+            page_scopes, request, *args, **kwargs)[0],
+        last_modified_func=lambda request, *args, **kwargs: page_validators(
+            page_scopes, request, *args, **kwargs)[1],
+    )
+
+
+def aconditional(page_scopes):
+    """conditional для async-представлений.
+
+    Валидаторы считаются в потоке (кэш и база синхронные), заголовки
+    и ответ 304 - как у django.views.decorators.http.condition.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            etag, modified = await sync_to_async(page_validators)(
+                page_scopes, request, *args, **kwargs)
+            etag = quote_etag(etag) if etag else None
+            timestamp = int(modified.timestamp()) if modified else None
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                if timestamp and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(timestamp)
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            return response
+
+        return inner
+
+    return decorator
+
+
+def found(request):
+    """Нашёл ли conditional объект страницы (page_scopes не вернул None)."""
+    return getattr(request, '_validators', (None, None))[0] is not None
+
+
+def index_scopes(request):
+    return ['posts'], None
+
+
+def group_scopes(request, slug):
+    group_id = (
+        Group.objects.filter(slug=slug).values_list('pk', flat=True).first())
+    if group_id is None:
+        return None
+    return [f'group:{group_id}'], None
+
+
+def profile_scopes(request, username):
+    author_id = (
+        User.objects.filter(username=username)
+        .values_list('pk', flat=True).first())
+    if author_id is None:
+        return None
+    # follow:<автор> - счётчик его подписок в шапке профиля.
+    scopes = [
+        f'author:{author_id}', f'followers:{author_id}',
+        f'follow:{author_id}']
+    if request.user.is_authenticated:
+        scopes.append(f'follow:{request.user.pk}')
+    return scopes, None
+
+
+def follow_scopes(request):
+    if not request.user.is_authenticated:
+        return None
+    return ['posts', f'follow:{request.user.pk}'], None
+
+
+def post_scopes(request, post_id):
+    post = (
+        Post.objects.filter(pk=post_id)
+        .values('author_id', 'pub_date').first())
+    if post is None:
+        return None
+    return (
+        [f'post:{post_id}', f'author:{post["author_id"]}'],
+        post['pub_date'],
+    )
@@ -0,0 +1,142 @@
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Post, Profile, User
+
+BATCH_SIZE = 1000
+
+
+def _count(queryset, field, outer='pk'):
+    """Подзапрос с количеством строк queryset для внешней записи."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef(outer)})
+            .order_by().values(field)
+            .annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField()),
+        0)
+
+
+# Счётчик профиля -> (аннотация пользователя, таблица, поле связи).
+PROFILE_COUNTERS = {
+    'posts_count': ('actual_posts', Post.objects.all(), 'author'),
+    'followers_count': ('actual_followers', Follow.objects.all(), 'author'),
+    'following_count': ('actual_following', Follow.objects.all(), 'user'),
+}
+
+
+def actual_profile_counts(users):
+    """Пересчитанные по таблицам счётчики для queryset пользователей."""
+    return users.annotate(**{
+        actual: _count(queryset, field)
+        for actual, queryset, field in PROFILE_COUNTERS.values()
+    })
+
+
+def get_profile(user):
+    """Профиль со счётчиками; отсутствующий создаётся пересчётом."""
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        counts = actual_profile_counts(User.objects.filter(pk=user.pk)).get()
+        profile, _ = Profile.objects.get_or_create(
+            user=user,
+            defaults={
+                'posts_count': counts.actual_posts,
+                'followers_count': counts.actual_followers,
+                'following_count': counts.actual_following,
+            })
+        user.profile = profile
+        return profile
+
+
+def change_profile_counter(user_id, field, delta):
+    """Атомарно меняет счётчик профиля на delta.
+
+    Профиль без строки создаётся только при увеличении: при уменьшении
+    пользователь может удаляться каскадом вместе со своими постами.
+    """
+    if delta < 0:
+        Profile.objects.filter(
+            user_id=user_id, **{f'{field}__gt': 0}
+        ).update(**{field: F(field) + delta})
+        return
+    updated = Profile.objects.filter(user_id=user_id).update(
+        **{field: F(field) + delta})
+    if not updated:
+        get_profile(User.objects.get(pk=user_id))
+
+
+def change_comments_counter(post_id, delta):
+    """Атомарно меняет счётчик комментариев поста на delta."""
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comments_count__gt=0)
+    posts.update(comments_count=F('comments_count') + delta)
+
+
+def _batches(queryset, batch_size):
+    """Куски queryset по возрастанию pk, каждый - отдельным запросом."""
+    queryset = queryset.order_by('pk')
+    batch = list(queryset[:batch_size])
+    while batch:
+        yield batch
+        batch = list(queryset.filter(pk__gt=batch[-1].pk)[:batch_size])
+
+
+def _profile_drift(user, fix):
+    try:
+        profile = user.profile
+    except Profile.DoesNotExist:
+        profile = None
+    drift = []
+    for field, (actual, _, _) in PROFILE_COUNTERS.items():
+        stored = 0 if profile is None else getattr(profile, field)
+        real = getattr(user, actual)
+        if stored != real:
+            drift.append((user, field, stored, real))
+    if not fix:
+        return drift
+    if profile is None:
+        get_profile(user)
+    elif drift:
+        # Пересчёт прямо в UPDATE и только счётчиков: прибавки сигналов
+        # после чтения и остальные поля профиля не затираются.
+        Profile.objects.filter(pk=profile.pk).update(**{
+            field: _count(*PROFILE_COUNTERS[field][1:], outer='user')
+            for _, field, _, _ in drift
+        })
+    return drift
+
+
+def rebuild_counters(fix=True, batch_size=BATCH_SIZE):
+    """Пересчитывает все счётчики с нуля и возвращает найденные расхождения.
+
+    Результат: список кортежей (объект, поле, было, стало). Исправления
+    фиксируются пачками по batch_size записей, а не одной долгой
+    транзакцией.
+    """
+    drift = []
+    users = actual_profile_counts(User.objects.select_related('profile'))
+    for batch in _batches(users, batch_size):
+        with transaction.atomic():
+            for user in batch:
+                drift += _profile_drift(user, fix)
+
+    comments = _count(Comment.objects.all(), 'post')
+    posts = (
+        Post.objects.annotate(actual_comments=comments)
+        .exclude(comments_count=F('actual_comments'))
+        .only('pk', 'text', 'comments_count')
+    )
+    for batch in _batches(posts, batch_size):
+        drift += [
+            (post, 'comments_count', post.comments_count,
+             post.actual_comments)
+            for post in batch
+        ]
+        if fix:
+            Post.objects.filter(pk__in=[post.pk for post in batch]).update(
+                comments_count=comments)
+    return drift
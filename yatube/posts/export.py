@@ -0,0 +1,135 @@
+"""Потоковая выгрузка постов, комментариев и подписок (NDJSON/CSV).
+
+Строки читаются итератором по возрастанию id порциями по chunk_size,
+поэтому память не зависит от объёма таблиц. Прерванную выгрузку можно
+продолжить с последнего выгруженного id (after_id).
+"""
+import csv
+import json
+import os
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, Follow, Post
+
+# Выгружаемые поля: имя в выгрузке -> поле модели. Авторы и группы
+# выгружаются по username и slug, чтобы выгрузку можно было загрузить
+# в другую базу.
+EXPORTS = {
+    'posts': (Post, {
+        'id': 'pk',
+        'author': 'author__username',
+        'group': 'group__slug',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'image': 'image',
+    }),
+    'comments': (Comment, {
+        'id': 'pk',
+        'post': 'post_id',
+        'author': 'author__username',
+        'text': 'text',
+        'created': 'created',
+    }),
+    'follows': (Follow, {
+        'id': 'pk',
+        'user': 'user__username',
+        'author': 'author__username',
+    }),
+}
+FORMATS = ('ndjson', 'csv')
+CHUNK_SIZE = 2000
+
+
+def export_rows(kind, after_id=0, chunk_size=CHUNK_SIZE):
+    """Строки выгрузки kind (словари) с id больше after_id."""
+    model, fields = EXPORTS[kind]
+    rows = (
+        model.objects.filter(pk__gt=after_id).order_by('pk')
+        .values_list(*fields.values()).iterator(chunk_size=chunk_size)
+    )
+    names = list(fields)
+    for row in rows:
+        yield dict(zip(names, row))
+
+
+class _Echo:
+    """Файл для csv.writer, который возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        line = json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False)
+        yield line + '\n'
+
+
+def csv_lines(rows, fields, header=True):
+    writer = csv.writer(_Echo())
+    if header:
+        yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(
+            '' if value is None else
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in row.values())
+
+
+def export_lines(kind, export_format, after_id=0, chunk_size=CHUNK_SIZE,
+                 header=True):
+    """Строки файла выгрузки в формате export_format."""
+    rows = export_rows(kind, after_id, chunk_size)
+    if export_format == 'csv':
+        return csv_lines(rows, list(EXPORTS[kind][1]), header)
+    return ndjson_lines(rows)
+
+
+def _last_ndjson_record(path):
+    # JSON-строки не содержат переводов строки: хватает хвоста файла.
+    with open(path, 'rb') as export_file:
+        export_file.seek(0, os.SEEK_END)
+        start = max(export_file.tell() - 64 * 1024, 0)
+        export_file.seek(start)
+        tail = export_file.read()
+    end = tail.rfind(b'\n') + 1
+    while end > 0:
+        begin = tail.rfind(b'\n', 0, end - 1) + 1
+        try:
+            return int(json.loads(tail[begin:end])['id']), start + end
+        except (ValueError, KeyError, TypeError):
+            end = begin
+    return 0, 0
+
+
+def _last_csv_record(path):
+    # В тексте поста бывают переводы строк, поэтому файл читается целиком:
+    # запись закончена, когда число кавычек в ней чётное.
+    last_id, last_end, offset, record = 0, 0, 0, b''
+    with open(path, 'rb') as export_file:
+        for line in export_file:
+            offset += len(line)
+            record += line
+            if record.count(b'"') % 2 or not record.endswith(b'\n'):
+                continue
+            row = next(csv.reader([record.decode('utf-8')]), None)
+            record = b''
+            if row and row[0].isdigit():
+                last_id, last_end = int(row[0]), offset
+            elif not last_id:
+                last_end = offset
+    return last_id, last_end
+
+
+def resume_position(path, export_format):
+    """id последней целиком записанной строки файла и конец этой строки.
+
+    Оборванная последняя строка в расчёт не берётся: файл нужно обрезать
+    до возвращённой позиции и дописать выгрузку после этого id.
+    """
+    if not os.path.exists(path):
+        return 0, 0
+    if export_format == 'csv':
+        return _last_csv_record(path)
+    return _last_ndjson_record(path)
@@ -1,9 +1,30 @@
 from django import forms
 
 from .models import Post, Comment
+from .tasks import process_image
 
 
 class PostForm(forms.ModelForm):
+    def save(self, commit=True):
+        post = super().save(commit=False)
+        image_changed = 'image' in self.changed_data
+        if image_changed:
+            post.thumbnails = {}
+        if commit:
+            if post._state.adding:
+                post.save()
+            else:
+                # Только поля формы: счётчики (comments_count) тем временем
+                # меняют другие запросы, старые значения их бы затёрли.
+                fields = list(self._meta.fields)
+                if image_changed:
+                    fields.append('thumbnails')
+                post.save(update_fields=fields)
+            self.save_m2m()
+            if image_changed and post.image:
+                process_image.delay(post.pk)
+        return post
+
     class Meta:
         model = Post
         fields = ['text', 'group', 'image']
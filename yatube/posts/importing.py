@@ -0,0 +1,244 @@
+"""Пакетная загрузка постов и комментариев из NDJSON/CSV.
+
+Формат строк - как у выгрузки posts.export: авторы и группы указываются
+по username и slug. Строки вставляются через bulk_create, сигналы при
+этом не срабатывают, поэтому счётчики, ленты подписок, версии кэша
+и поисковый индекс исправляются один раз в конце (Importer.finish).
+Запись, которую нельзя загрузить, останавливает загрузку с RecordError;
+уже вставленные пачки остаются в базе.
+"""
+import csv
+import json
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .caching import bump_version
+from .counters import rebuild_counters
+from .models import Comment, Group, Post, User
+from .search import rebuild_index
+from .seeding import manual_dates
+from .timeline import backfill_followers, is_fanned_out, sync_fanout
+
+BATCH_SIZE = 5000
+
+
+class RecordError(ValueError):
+    """Запись, которую нельзя загрузить; line - номер строки файла."""
+
+    def __init__(self, line, error, last_line=None):
+        self.line = line
+        if isinstance(error, KeyError):
+            error = f'нет поля {error}'
+        where = (
+            f'строки {line}-{last_line}' if last_line not in (None, line)
+            else f'строка {line}')
+        super().__init__(f'{where}: {error}')
+
+
+def read_records(lines, import_format):
+    """Пары (номер строки, словарь записи) из итератора строк файла,
+    без чтения целиком. У записи CSV - номер её последней строки."""
+    if import_format == 'csv':
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            raise RecordError(number, error) from error
+        if not isinstance(record, dict):
+            raise RecordError(number, 'ожидался объект JSON')
+        yield number, record
+
+
+class Resolver:
+    """Id пользователей и групп по username и slug с памятью в словарях.
+
+    Неизвестные авторы и группы создаются одним запросом на пачку.
+    """
+
+    def __init__(self):
+        self.users = {}
+        self.groups = {}
+        self.created_users = 0
+        self.created_groups = 0
+        self.password = make_password(None)
+
+    def _load(self, cache, queryset, field, names):
+        missing = set(names) - set(cache) - {None, ''}
+        if missing:
+            cache.update(
+                queryset.filter(**{f'{field}__in': missing})
+                .values_list(field, 'pk'))
+        return missing - set(cache)
+
+    def load_users(self, usernames):
+        missing = self._load(
+            self.users, User.objects, 'username', usernames)
+        if missing:
+            User.objects.bulk_create(
+                (User(username=name, password=self.password)
+                 for name in missing),
+                ignore_conflicts=True)
+            self.created_users += len(missing)
+            self._load(self.users, User.objects, 'username', missing)
+
+    def load_groups(self, slugs):
+        missing = self._load(self.groups, Group.objects, 'slug', slugs)
+        if missing:
+            Group.objects.bulk_create(
+                (Group(title=slug, slug=slug, description='')
+                 for slug in missing),
+                ignore_conflicts=True)
+            self.created_groups += len(missing)
+            self._load(self.groups, Group.objects, 'slug', missing)
+
+    def user(self, username):
+        return self.users[username]
+
+    def group(self, slug):
+        return self.groups.get(slug) if slug else None
+
+
+def _record_id(record):
+    value = record.get('id')
+    return int(value) if value not in (None, '') else None
+
+
+def _date(value, default):
+    return (parse_datetime(value) if value else None) or default
+
+
+def _build(batch, make):
+    """Объекты моделей из пар (номер строки, запись) пачки."""
+    objects = []
+    for line, record in batch:
+        try:
+            objects.append(make(record))
+        except (KeyError, ValueError, TypeError) as error:
+            raise RecordError(line, error) from error
+    return objects
+
+
+class Importer:
+    """Загрузка пачками; запоминает, что нужно исправить в конце.
+
+    Id из файла сохраняются, чтобы комментарии нашли свои посты.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, progress=None):
+        self.batch_size = batch_size
+        self.progress = progress or (lambda message: None)
+        self.resolver = Resolver()
+        self.authors = set()
+        self.groups = set()
+        self.commented_posts = set()
+        self.counts = {'posts': 0, 'comments': 0}
+        self.started = time.monotonic()
+
+    def _report(self, kind):
+        elapsed = time.monotonic() - self.started
+        total = self.counts[kind]
+        self.progress(
+            f'{kind}: {total} ({total / max(elapsed, 1e-9):.0f} строк/с)')
+
+    def _posts(self, batch):
+        self.resolver.load_users(record.get('author') for _, record in batch)
+        self.resolver.load_groups(record.get('group') for _, record in batch)
+        now = timezone.now()
+        posts = _build(batch, lambda record: Post(
+            pk=_record_id(record),
+            author_id=self.resolver.user(record['author']),
+            group_id=self.resolver.group(record.get('group')),
+            text=record['text'],
+            image=record.get('image') or '',
+            pub_date=_date(record.get('pub_date'), now)))
+        Post.objects.bulk_create(posts)
+        self.authors.update(post.author_id for post in posts)
+        self.groups.update(post.group_id for post in posts)
+
+    def _comments(self, batch):
+        self.resolver.load_users(record.get('author') for _, record in batch)
+        now = timezone.now()
+        comments = _build(batch, lambda record: Comment(
+            pk=_record_id(record),
+            post_id=int(record['post']),
+            author_id=self.resolver.user(record['author']),
+            text=record['text'],
+            created=_date(record.get('created'), now)))
+        Comment.objects.bulk_create(comments)
+        self.commented_posts.update(comment.post_id for comment in comments)
+
+    def load(self, kind, records):
+        """Вставляет записи kind ('posts' или 'comments') пачками.
+
+        records - пары (номер строки, запись) из read_records. На плохой
+        записи пачка откатывается и поднимается RecordError, прежние
+        пачки остаются: после ошибки тоже нужен finish().
+        """
+        model, insert = (
+            (Post, self._posts) if kind == 'posts'
+            else (Comment, self._comments))
+        records = iter(records)
+        try:
+            with manual_dates(Post, Comment):
+                while batch := list(islice(records, self.batch_size)):
+                    self._insert(insert, batch)
+                    self.counts[kind] += len(batch)
+                    self._report(kind)
+        finally:
+            self._reset_sequences([model])
+        return self.counts[kind]
+
+    def _insert(self, insert, batch):
+        try:
+            with transaction.atomic():
+                insert(batch)
+        except IntegrityError as error:
+            # Какая запись пачки нарушила ограничение, bulk_create
+            # не сообщает.
+            raise RecordError(batch[0][0], error, batch[-1][0]) from error
+
+    def _reset_sequences(self, models):
+        # Id заданы явно: последовательности PostgreSQL нужно сдвинуть
+        # за них, как это делает loaddata.
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def finish(self):
+        """Исправляет всё, что при вставке обновили бы сигналы."""
+        self.progress('Пересчёт счётчиков...')
+        rebuild_counters()
+        self.progress('Ленты подписок...')
+        if settings.FOLLOW_TIMELINE:
+            sync_fanout()
+            for author_id in self.authors:
+                if is_fanned_out(author_id):
+                    backfill_followers(author_id)
+        self.progress('Поисковый индекс...')
+        with transaction.atomic():
+            rebuild_index()
+        self.progress('Версии кэша...')
+        scopes = {
+            *(f'author:{pk}' for pk in self.authors),
+            *(f'group:{pk}' for pk in self.groups - {None}),
+            *(f'post:{pk}' for pk in self.commented_posts),
+        }
+        if self.counts['posts']:
+            scopes.add('posts')
+        for scope in scopes:
+            bump_version(scope)
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncRequestFactory, RequestFactory
+from django.test.utils import (override_settings, setup_databases,
+                               setup_test_environment, teardown_databases,
+                               teardown_test_environment)
+from django.urls import reverse
+
+from posts import async_views, views
+from posts.benchmark import db_latency, percentile, route_kwargs
+from posts.counters import rebuild_counters
+from posts.models import User
+from posts.seeding import fill_timelines, seed_data
+
+# Представление -> параметры маршрута из route_kwargs.
+VIEWS = {
+    'index': (),
+    'group_post': ('slug',),
+    'profile': ('username',),
+    'post_detail': ('post_id',),
+    'follow_index': (),
+}
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность синхронных (posts.views, '
+            'пул потоков как у WSGI-сервера) и асинхронных '
+            '(posts.async_views, один цикл событий) лент при большом '
+            'числе одновременных запросов на отдельной тестовой базе.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--comments', type=int, default=10_000)
+        parser.add_argument('--follows', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--requests', type=int, default=300,
+            help='Запросов к каждому представлению.')
+        parser.add_argument(
+            '--concurrency', type=int, default=100,
+            help='Одновременных запросов.')
+        parser.add_argument(
+            '--workers', type=int, default=8,
+            help='Потоков у синхронного варианта.')
+        parser.add_argument(
+            '--latency', type=float, default=2.0,
+            help='Задержка каждого SQL-запроса, мс.')
+        parser.add_argument(
+            '--no-cache', action='store_true',
+            help='Не кэшировать фрагменты лент и число постов.')
+
+    def handle(self, *args, **options):
+        # Без DEBUG: иначе в замеры попадает django-debug-toolbar.
+        setup_test_environment(debug=False)
+        old_config = setup_databases(
+            verbosity=0, interactive=False, aliases={'default'})
+        try:
+            user_ids = seed_data(
+                users=options['users'], posts=options['posts'],
+                comments=options['comments'],
+                follows_per_user=options['follows'],
+                random_seed=options['seed'])
+            rebuild_counters(fix=True)
+            fill_timelines()
+            user = User.objects.get(pk=user_ids[0])
+            overrides = (
+                {'FEED_CACHE_TIMEOUT': 0} if options['no_cache'] else {})
+            with override_settings(DEBUG=False, **overrides), \
+                    db_latency(options['latency'] / 1000):
+                self.compare(user, options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+    def compare(self, user, options):
+        values = route_kwargs(user)
+        self.stdout.write(
+            f'{"представление":<14}{"wsgi rps":>10}{"asgi rps":>10}'
+            f'{"wsgi p95":>10}{"asgi p95":>10}')
+        for name, params in VIEWS.items():
+            kwargs = {param: values[param] for param in params}
+            url = reverse(f'posts:{name}', kwargs=kwargs)
+            sync = self.run_sync(
+                getattr(views, name), url, kwargs, user, options)
+            concurrent = asyncio.run(self.run_async(
+                getattr(async_views, name), url, kwargs, user, options))
+            self.stdout.write(
+                f'{name:<14}{sync[0]:>10.0f}{concurrent[0]:>10.0f}'
+                f'{sync[1]:>8.1f}мс{concurrent[1]:>8.1f}мс')
+
+    @staticmethod
+    def summary(latencies, elapsed):
+        return len(latencies) / elapsed, percentile(latencies, 95) * 1000
+
+    def run_sync(self, view, url, kwargs, user, options):
+        factory = RequestFactory()
+
+        def handle(_):
+            request = factory.get(url)
+            request.user = user
+            started = time.perf_counter()
+            try:
+                view(request, **kwargs)
+            finally:
+                # Как по окончании запроса в WSGI-обработчике.
+                connections.close_all()
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['workers']) as pool:
+            latencies = list(pool.map(handle, range(options['requests'])))
+        return self.summary(latencies, time.perf_counter() - started)
+
+    async def run_async(self, view, url, kwargs, user, options):
+        factory = AsyncRequestFactory()
+        limit = asyncio.Semaphore(options['concurrency'])
+
+        async def handle():
+            async with limit:
+                request = factory.get(url)
+                request.user = user
+                started = time.perf_counter()
+                await view(request, **kwargs)
+                return time.perf_counter() - started
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(
+            *(handle() for _ in range(options['requests'])))
+        return self.summary(latencies, time.perf_counter() - started)
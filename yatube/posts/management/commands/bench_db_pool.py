@@ -0,0 +1,107 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import RequestFactory
+from django.test.utils import (override_settings, setup_databases,
+                               teardown_databases)
+from django.urls import reverse
+
+from posts.benchmark import percentile
+from posts.counters import rebuild_counters
+from posts.models import Post
+from posts.seeding import seed_data
+
+# Режим -> изменения настроек базы 'default'.
+MODES = {
+    'connect': {'CONN_MAX_AGE': 0, 'POOL': None},
+    'persistent': {'CONN_MAX_AGE': 600, 'POOL': None},
+    'pool': {'CONN_MAX_AGE': 0, 'POOL': {}},
+}
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает число запросов в секунду к PostgreSQL при новом '
+            'соединении на каждый запрос, постоянных соединениях '
+            '(CONN_MAX_AGE) и пуле соединений (POOL) на отдельной тестовой '
+            'базе. Запросы проходят через WSGIHandler со всеми middleware '
+            'и сигналами начала и конца запроса.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument(
+            '--pool-size', type=int, default=8,
+            help='Размер пула; меньше --workers - потоки ждут соединения.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError(
+                'Нужна PostgreSQL: DB_ENGINE=postgresql в .env.')
+        # psycopg2 установлен только там, где используется PostgreSQL.
+        from core.db.postgresql.base import close_pools
+        self.close_pools = close_pools
+        old_config = setup_databases(
+            verbosity=0, interactive=False, aliases={'default'})
+        try:
+            seed_data(
+                users=100, posts=options['posts'],
+                comments=options['posts'], random_seed=options['seed'])
+            rebuild_counters(fix=True)
+            post = Post.objects.order_by('-comments_count').first()
+            urls = [
+                reverse('posts:index'),
+                reverse('posts:post_detail', args=[post.pk]),
+                reverse('api:index'),
+            ]
+            self.stdout.write(
+                f'{"режим":<12}{"rps":>8}{"p50":>10}{"p95":>10}')
+            # Без кэша лент каждый запрос доходит до базы; без DEBUG - не
+            # замеряется django-debug-toolbar.
+            with override_settings(FEED_CACHE_TIMEOUT=0, DEBUG=False):
+                for mode, changes in MODES.items():
+                    rps, p50, p95 = self.run(urls, changes, options)
+                    self.stdout.write(
+                        f'{mode:<12}{rps:>8.0f}{p50:>8.1f}мс{p95:>8.1f}мс')
+        finally:
+            connections['default'].settings_dict.update(MODES['connect'])
+            self.close_pools()
+            teardown_databases(old_config, verbosity=0)
+
+    def run(self, urls, changes, options):
+        settings_dict = connections['default'].settings_dict
+        settings_dict.update(changes)
+        if settings_dict['POOL'] is not None:
+            settings_dict['POOL'] = {'max_size': options['pool_size']}
+        handler = WSGIHandler()
+        factory = RequestFactory()
+        opened = []
+
+        def request(number):
+            environ = factory.get(urls[number % len(urls)]).environ
+            started = time.perf_counter()
+            response = handler(environ, lambda status, headers: None)
+            b''.join(response)
+            # Сервер закрывает ответ: сигнал request_finished.
+            response.close()
+            opened.append(connections['default'])
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['workers']) as pool:
+            latencies = list(pool.map(request, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+        # Постоянные соединения потоков пула закрываются вручную.
+        for wrapper in set(opened):
+            if wrapper.connection is not None:
+                wrapper.connection.close()
+        self.close_pools()
+        return (
+            len(latencies) / elapsed,
+            percentile(latencies, 50) * 1000,
+            percentile(latencies, 95) * 1000,
+        )
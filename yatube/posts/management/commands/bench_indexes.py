@@ -0,0 +1,128 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+
+from posts.models import Comment, Follow, Post
+from posts.paginator import CursorPaginator
+from posts.seeding import seed_data
+
+# Индексы из миграции 0008_feed_indexes.
+FEED_INDEXES = (
+    'post_pub_date_idx',
+    'post_author_date_idx',
+    'post_group_date_idx',
+    'comment_post_created_idx',
+    'follow_author_user_idx',
+)
+
+
+class Command(BaseCommand):
+    help = ('Показывает планы и время запросов лент без индексов '
+            '0008_feed_indexes и с ними на отдельной тестовой базе.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--comments', type=int, default=200_000)
+        parser.add_argument('--follows', type=int, default=30)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        old_config = setup_databases(
+            verbosity=0, interactive=False, aliases={'default'})
+        try:
+            self.stdout.write('Заполнение базы...')
+            user_ids = seed_data(
+                users=options['users'],
+                groups=options['groups'],
+                posts=options['posts'],
+                comments=options['comments'],
+                follows_per_user=options['follows'],
+                random_seed=options['seed'],
+                progress=lambda message: self.stdout.write(
+                    f'  {message}', ending='\r'),
+            )
+            self.stdout.write('')
+            queries = self.feed_queries(user_ids)
+            self.set_indexes(create=False)
+            before = self.measure(queries, options['repeat'])
+            self.set_indexes(create=True)
+            after = self.measure(queries, options['repeat'])
+            self.report(queries, before, after)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def feed_indexes(self):
+        return [
+            (model, index)
+            for model in (Post, Comment, Follow)
+            for index in model._meta.indexes
+            if index.name in FEED_INDEXES
+        ]
+
+    def set_indexes(self, create):
+        with connection.schema_editor() as editor:
+            for model, index in self.feed_indexes():
+                if create:
+                    editor.add_index(model, index)
+                else:
+                    editor.remove_index(model, index)
+
+    def feed_queries(self, user_ids):
+        """Запросы, которые выполняют ленты, с типичными параметрами."""
+        feed = Post.objects.for_feed()
+        middle = Post.objects.count() // 2
+        deep = Post.objects.order_by('-pub_date', '-pk')[middle]
+        follow = Follow.objects.filter(user_id=user_ids[0]).first()
+        busy_post = (
+            Comment.objects.order_by('-created')
+            .values_list('post_id', flat=True).first())
+        paginator = CursorPaginator(feed, 10)
+        return {
+            'index': feed[:10],
+            'index, середина (offset)': feed[middle:middle + 10],
+            'index, середина (cursor)': paginator._older(
+                (deep.pub_date, deep.pk))[:11],
+            'group_post': feed.filter(group_id=deep.group_id)[:10],
+            'profile': feed.filter(author_id=deep.author_id)[:10],
+            'follow_index': feed.filter(
+                author__following__user_id=user_ids[0])[:10],
+            'post_detail, комментарии': Comment.objects.filter(
+                post_id=busy_post),
+            'profile, подписка': Follow.objects.filter(
+                author_id=follow.author_id if follow else deep.author_id,
+                user_id=user_ids[0]),
+        }
+
+    def measure(self, queries, repeat):
+        results = {}
+        for name, queryset in queries.items():
+            plan = queryset.explain()
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = (plan, statistics.median(timings))
+        return results
+
+    def report(self, queries, before, after):
+        self.stdout.write(
+            f'{connection.vendor}, постов: {Post.objects.count()}')
+        for name in queries:
+            plan_before, time_before = before[name]
+            plan_after, time_after = after[name]
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(f'  без индексов: {time_before:.2f} мс')
+            self.stdout.write(_indent(plan_before))
+            self.stdout.write(f'  с индексами:  {time_after:.2f} мс')
+            self.stdout.write(_indent(plan_after))
+
+
+def _indent(text):
+    return '\n'.join(f'    {line}' for line in text.splitlines())
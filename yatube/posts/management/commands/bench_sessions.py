@@ -0,0 +1,116 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import (CaptureQueriesContext, override_settings,
+                               setup_databases, setup_test_environment,
+                               teardown_databases, teardown_test_environment)
+from django.urls import reverse
+
+from posts.benchmark import percentile
+from posts.counters import rebuild_counters
+from posts.models import Group, User
+from posts.seeding import seed_data
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_TABLE = 'django_session'
+DJANGO_MIDDLEWARE = 'django.contrib.sessions.middleware.SessionMiddleware'
+SESSIONLESS_MIDDLEWARE = 'core.sessions.SessionMiddleware'
+
+
+def with_session_middleware(middleware):
+    return [
+        middleware if name in (DJANGO_MIDDLEWARE, SESSIONLESS_MIDDLEWARE)
+        else name
+        for name in settings.MIDDLEWARE
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный тест лент (index, group_post) с разными '
+            'хранилищами сессий (SESSION_STORE) и SessionMiddleware: '
+            'сколько запросов к django_session приходится на запрос '
+            'страницы и сколько их экономится по сравнению с db.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Запросов в каждом прогоне.')
+
+    def handle(self, *args, **options):
+        # Без DEBUG: иначе в замеры попадает django-debug-toolbar.
+        setup_test_environment(debug=False)
+        old_config = setup_databases(
+            verbosity=0, interactive=False, aliases={'default'})
+        try:
+            user_ids = seed_data(
+                users=options['users'], posts=options['posts'],
+                comments=0, random_seed=options['seed'])
+            rebuild_counters(fix=True)
+            user = User.objects.get(pk=user_ids[0])
+            group = Group.objects.first()
+            urls = [reverse('posts:index')]
+            if group is not None:
+                urls.append(reverse('posts:group_post', args=[group.slug]))
+            with override_settings(DEBUG=False):
+                self.compare(user, urls, options['requests'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+    def compare(self, user, urls, requests):
+        self.stdout.write(
+            f'{"хранилище":<11}{"посетитель":<16}{"middleware":<12}'
+            f'{"сессия/запр.":>13}{"SQL/запр.":>11}{"сэкономлено":>13}'
+            f'{"p95, мс":>9}')
+        baseline = {}
+        for store, engine in SESSION_ENGINES.items():
+            for visitor, middleware in (
+                    ('вошедший', SESSIONLESS_MIDDLEWARE),
+                    ('аноним', DJANGO_MIDDLEWARE),
+                    ('аноним', SESSIONLESS_MIDDLEWARE)):
+                with override_settings(
+                        SESSION_ENGINE=engine,
+                        MIDDLEWARE=with_session_middleware(middleware)):
+                    result = self.run(
+                        user if visitor == 'вошедший' else None,
+                        urls, requests)
+                session_queries, queries, p95 = result
+                saved = baseline.setdefault(
+                    visitor, session_queries) - session_queries
+                label = (
+                    'core' if middleware == SESSIONLESS_MIDDLEWARE
+                    else 'django')
+                self.stdout.write(
+                    f'{store:<11}{visitor:<16}{label:<12}'
+                    f'{session_queries:>13.2f}{queries:>11.2f}'
+                    f'{saved:>13.2f}{p95 * 1000:>9.1f}')
+
+    def run(self, user, urls, requests):
+        """Среднее число запросов к django_session и всех SQL-запросов
+        на страницу и 95-й процентиль времени ответа."""
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        session_queries = queries = 0
+        timings = []
+        for number in range(requests):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                client.get(urls[number % len(urls)])
+                timings.append(time.perf_counter() - started)
+            queries += len(captured)
+            session_queries += sum(
+                SESSION_TABLE in query['sql'] for query in captured)
+        return (
+            session_queries / requests, queries / requests,
+            percentile(timings, 95))
@@ -0,0 +1,148 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.test.utils import (override_settings, setup_databases,
+                               teardown_databases)
+
+from posts.benchmark import percentile
+from posts.counters import rebuild_counters
+from posts.models import Comment, Post, User
+from posts.seeding import seed_data
+
+# Настройки SQLite по умолчанию: журнал отката, fsync на каждой фиксации.
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность чтения лент и записи '
+            'комментариев из нескольких потоков на файле SQLite без '
+            'настройки и с SQLITE_PRAGMAS (WAL, synchronous=NORMAL, mmap, '
+            'busy_timeout).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=20_000)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument(
+            '--seconds', type=float, default=5,
+            help='Длительность каждого прогона.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда проверяет только SQLite.')
+        tuned = settings.SQLITE_PRAGMAS or {
+            'busy_timeout': 5000, 'journal_mode': 'WAL',
+            'synchronous': 'NORMAL', 'mmap_size': 256 * 1024 * 1024}
+        directory = tempfile.mkdtemp()
+        # Файл, а не база в памяти: WAL и блокировки работают только так.
+        test_settings = connections['default'].settings_dict['TEST']
+        old_name = test_settings.get('NAME')
+        test_settings['NAME'] = os.path.join(directory, 'bench.sqlite3')
+        try:
+            with override_settings(SQLITE_PRAGMAS=DEFAULT_PRAGMAS):
+                old_config = setup_databases(
+                    verbosity=0, interactive=False, aliases={'default'})
+            try:
+                with override_settings(SQLITE_PRAGMAS=DEFAULT_PRAGMAS):
+                    connection.close()
+                    self.seed(options)
+                self.stdout.write(
+                    f'{"режим":<10}{"чтений/с":>10}{"записей/с":>11}'
+                    f'{"ошибок":>8}{"p95 записи":>12}')
+                for mode, pragmas in (('default', DEFAULT_PRAGMAS),
+                                      ('tuned', tuned)):
+                    # Без DEBUG запросы не записываются в connection.queries.
+                    with override_settings(
+                            SQLITE_PRAGMAS=pragmas, DEBUG=False):
+                        connection.close()
+                        self.report(mode, self.run(options))
+            finally:
+                teardown_databases(old_config, verbosity=0)
+        finally:
+            test_settings['NAME'] = old_name
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def seed(self, options):
+        seed_data(
+            users=200, posts=options['posts'], comments=options['posts'],
+            random_seed=options['seed'])
+        rebuild_counters(fix=True)
+
+    def report(self, mode, result):
+        reads, writes, errors, p95 = result
+        seconds = self.seconds
+        self.stdout.write(
+            f'{mode:<10}{reads / seconds:>10.0f}{writes / seconds:>11.0f}'
+            f'{errors:>8}{p95:>10.1f}мс')
+
+    def run(self, options):
+        self.seconds = options['seconds']
+        self.user_ids = list(User.objects.values_list('pk', flat=True))
+        self.post_ids = list(
+            Post.objects.values_list('pk', flat=True)[:1000])
+        self.deadline = time.monotonic() + self.seconds
+        self.lock = threading.Lock()
+        self.totals = {'reads': 0, 'writes': 0, 'errors': 0}
+        self.write_times = []
+        threads = [
+            threading.Thread(target=self.worker, args=(self.reader, number))
+            for number in range(options['readers'])
+        ] + [
+            threading.Thread(target=self.worker, args=(self.writer, number))
+            for number in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        totals, write_times = self.totals, self.write_times
+        p95 = percentile(write_times, 95) * 1000 if write_times else 0
+        return totals['reads'], totals['writes'], totals['errors'], p95
+
+    def worker(self, target, number):
+        try:
+            kind, count = target(number)
+            with self.lock:
+                self.totals[kind] += count
+        finally:
+            connections.close_all()
+
+    def reader(self, number):
+        """Читатель: лента и комментарии поста, пока не выйдет время."""
+        post_ids, count = self.post_ids, 0
+        while time.monotonic() < self.deadline:
+            post_id = post_ids[(number * 7919 + count) % len(post_ids)]
+            list(Post.objects.for_feed()[:10])
+            list(Comment.objects.filter(post_id=post_id)[:20])
+            count += 1
+        return 'reads', count
+
+    def writer(self, number):
+        """Писатель: комментарии по одному в транзакции; ошибки
+        блокировки (database is locked) считаются отдельно."""
+        post_ids, count = self.post_ids, 0
+        author_id = self.user_ids[number % len(self.user_ids)]
+        errors = 0
+        while time.monotonic() < self.deadline:
+            started = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    Comment.objects.create(
+                        post_id=post_ids[count % len(post_ids)],
+                        author_id=author_id,
+                        text='Комментарий под нагрузкой')
+            except OperationalError:
+                errors += 1
+                continue
+            self.write_times.append(time.perf_counter() - started)
+            count += 1
+        with self.lock:
+            self.totals['errors'] += errors
+        return 'writes', count
@@ -0,0 +1,126 @@
+import json
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (override_settings, setup_databases,
+                               setup_test_environment, teardown_databases,
+                               teardown_test_environment)
+
+from posts.benchmark import bench_routes, check_budget, data_volume
+from posts.counters import rebuild_counters
+from posts.models import User
+from posts.seeding import fill_timelines, seed_data, seed_images
+
+
+class Command(BaseCommand):
+    help = ('Проходит все маршруты posts, users и about на отдельной '
+            'тестовой базе и снимает число запросов, время SQL, шаблонов '
+            'и задержку (p50/p95). Завершается с ошибкой при превышении '
+            'бюджета BENCH_URL_BUDGETS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument('--images', type=int, default=50)
+        parser.add_argument('--comments', type=int, default=20_000)
+        parser.add_argument('--follows', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэш перед каждым запросом.')
+        parser.add_argument(
+            '--report', default='bench_urls.json',
+            help='Файл JSON-отчёта, "-" - вывести в stdout.')
+        parser.add_argument(
+            '--budget',
+            help='JSON-файл с бюджетом вместо BENCH_URL_BUDGETS.')
+
+    def handle(self, *args, **options):
+        budgets = settings.BENCH_URL_BUDGETS
+        if options['budget']:
+            with open(options['budget'], encoding='utf-8') as budget_file:
+                budgets = json.load(budget_file)
+        media_root = tempfile.mkdtemp()
+        # Без DEBUG: иначе в замеры попадает django-debug-toolbar.
+        setup_test_environment(debug=False)
+        old_config = setup_databases(
+            verbosity=0, interactive=False, aliases={'default'})
+        try:
+            with override_settings(MEDIA_ROOT=media_root, DEBUG=False):
+                self.seed(options)
+                user = User.objects.get(pk=self.user_ids[0])
+                results = bench_routes(
+                    user, repeat=options['repeat'], cold=options['cold'])
+                volume = data_volume()
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            shutil.rmtree(media_root, ignore_errors=True)
+        exceeded = check_budget(results, budgets)
+        self.print_table(results, exceeded)
+        self.write_report({
+            'vendor': connection.vendor,
+            'repeat': options['repeat'],
+            'cold': options['cold'],
+            'data': volume,
+            'routes': results,
+            'budget': budgets,
+            'exceeded': [
+                {'route': route, 'metric': metric,
+                 'value': value, 'limit': limit}
+                for route, metric, value, limit in exceeded
+            ],
+        }, options['report'])
+        if exceeded:
+            raise CommandError(f'Превышен бюджет: {len(exceeded)}')
+
+    def seed(self, options):
+        def progress(message):
+            self.stdout.write(f'  {message}', ending='\r')
+
+        self.stdout.write('Заполнение базы...')
+        self.user_ids = seed_data(
+            users=options['users'],
+            groups=options['groups'],
+            posts=options['posts'],
+            comments=options['comments'],
+            follows_per_user=options['follows'],
+            random_seed=options['seed'],
+            progress=progress,
+        )
+        rebuild_counters(fix=True)
+        fill_timelines(progress=progress)
+        seed_images(
+            options['images'], random_seed=options['seed'],
+            progress=progress)
+        self.stdout.write('')
+
+    def print_table(self, results, exceeded):
+        over = {route for route, *_ in exceeded}
+        self.stdout.write(
+            f'{"маршрут":<26}{"код":>5}{"запр.":>7}{"sql":>9}'
+            f'{"шабл.":>9}{"p50":>9}{"p95":>9}')
+        for result in results:
+            line = (
+                f'{result["route"]:<26}{result["status"]:>5}'
+                f'{result["queries"]:>7}{result["sql_ms"]:>9.2f}'
+                f'{result["template_ms"]:>9.2f}{result["p50_ms"]:>9.2f}'
+                f'{result["p95_ms"]:>9.2f}'
+            )
+            if result['route'] in over:
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+
+    def write_report(self, report, path):
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if path == '-':
+            self.stdout.write(text)
+            return
+        with open(path, 'w', encoding='utf-8') as report_file:
+            report_file.write(text)
+        self.stdout.write(f'Отчёт: {path}')
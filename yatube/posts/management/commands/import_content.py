@@ -0,0 +1,47 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importing import BATCH_SIZE, Importer, RecordError, read_records
+
+
+class Command(BaseCommand):
+    help = ('Загружает посты или комментарии из NDJSON/CSV (формат '
+            'export_content) пакетами bulk_create, затем пересчитывает '
+            'счётчики, ленты подписок, поисковый индекс и версии кэша.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=('posts', 'comments'))
+        parser.add_argument('path', help='Файл загрузки или - для stdin.')
+        parser.add_argument(
+            '--format', choices=('ndjson', 'csv'),
+            help='По умолчанию - по расширению файла.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'ndjson')
+        importer = Importer(
+            batch_size=options['batch_size'],
+            progress=lambda message: self.stderr.write(f'  {message}'))
+        try:
+            source = (
+                sys.stdin if path == '-'
+                else open(path, encoding='utf-8', newline=''))
+        except OSError as error:
+            raise CommandError(error)
+        try:
+            with source:
+                total = importer.load(
+                    options['kind'], read_records(source, import_format))
+        except RecordError as error:
+            raise CommandError(f'{path}, {error}') from error
+        finally:
+            # Пачки до ошибки уже в базе, их тоже нужно довести до конца.
+            importer.finish()
+        resolver = importer.resolver
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено: {total}, новых пользователей: '
+            f'{resolver.created_users}, новых групп: '
+            f'{resolver.created_groups}'))
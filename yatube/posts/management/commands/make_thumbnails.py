@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.thumbnails import process_post_image
+
+
+class Command(BaseCommand):
+    help = ('Создаёт миниатюры из THUMBNAIL_RENDITIONS для постов, '
+            'у которых их ещё нет.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересоздать миниатюры у всех постов с картинками.')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['all']:
+            posts = posts.filter(thumbnails={})
+        done = 0
+        for post_id in posts.values_list('pk', flat=True).iterator():
+            process_post_image(post_id, clean=False)
+            done += 1
+        self.stdout.write(self.style.SUCCESS(f'Обработано постов: {done}'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает с нуля счётчики постов, комментариев и подписок '
+            'и сообщает о расхождениях.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения, ничего не исправляя.')
+
+    def handle(self, *args, **options):
+        fix = not options['dry_run']
+        drift = rebuild_counters(fix=fix)
+        for obj, field, stored, actual in drift:
+            self.stdout.write(
+                f'{obj._meta.model_name} {obj.pk} ({obj}): '
+                f'{field} {stored} -> {actual}')
+        summary = f'Расхождений: {len(drift)}'
+        if drift and fix:
+            summary += ', исправлено'
+        self.stdout.write(self.style.SUCCESS(summary))
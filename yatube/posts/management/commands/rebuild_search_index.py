@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from posts.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = ('Заново заполняет полнотекстовый индекс постов (SQLite FTS5), '
+            'например после загрузки в обход сигналов. На PostgreSQL '
+            'индекс обновляется самой базой.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write('Индекс поддерживается базой, пересборка '
+                              'не нужна.')
+            return
+        with transaction.atomic():
+            total = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Проиндексировано: {total}'))
@@ -0,0 +1,91 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.caching import bump_version
+from posts.counters import rebuild_counters
+from posts.search import rebuild_index
+from posts.seeding import (SEED_EPOCH, attach_images, fill_timelines,
+                           seed_data)
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, группами, '
+            'постами, комментариями и подписками для нагрузочных проверок. '
+            'Данные определяются --seed; вставка пакетами bulk_create.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--comments', type=int, default=2_000_000)
+        parser.add_argument(
+            '--follows', type=int, default=30,
+            help='Среднее число подписок пользователя.')
+        parser.add_argument(
+            '--images', type=int, default=0,
+            help='Сколько последних постов получат картинки.')
+        parser.add_argument(
+            '--images-from',
+            default=os.path.join(settings.MEDIA_ROOT, 'posts'),
+            help='Каталог с исходными картинками.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--epoch', default=SEED_EPOCH.isoformat(),
+            help='Дата самого нового поста (ISO 8601); даты от неё, '
+                 'а не от текущего времени, чтобы --seed повторял данные.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--prefix', default='seed',
+            help='Префикс имён пользователей и slug групп.')
+
+    def handle(self, *args, **options):
+        epoch = parse_datetime(options['epoch'])
+        if epoch is None:
+            raise CommandError(f'Неверная дата --epoch: {options["epoch"]}')
+        if timezone.is_naive(epoch):
+            epoch = timezone.make_aware(epoch, timezone.utc)
+        started = time.monotonic()
+
+        def progress(message):
+            elapsed = time.monotonic() - started
+            self.stdout.write(f'  [{elapsed:7.1f} с] {message}', ending='\r')
+
+        with transaction.atomic():
+            seed_data(
+                users=options['users'],
+                groups=options['groups'],
+                posts=options['posts'],
+                comments=options['comments'],
+                follows_per_user=options['follows'],
+                random_seed=options['seed'],
+                batch_size=options['batch_size'],
+                prefix=options['prefix'],
+                progress=progress,
+                epoch=epoch,
+            )
+        self.stdout.write('')
+        for title, step in (
+            ('Счётчики', lambda: rebuild_counters(fix=True)),
+            ('Ленты подписок', lambda: fill_timelines(progress=progress)),
+            ('Поисковый индекс', rebuild_index),
+            ('Картинки', lambda: attach_images(
+                options['images'], options['images_from'],
+                random_seed=options['seed'], prefix=options['prefix'],
+                progress=progress)),
+        ):
+            progress(f'{title}...')
+            with transaction.atomic():
+                step()
+            self.stdout.write('')
+        bump_version('posts')
+        rows = sum(options[name] for name in ('users', 'posts', 'comments'))
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {elapsed:.1f} с, '
+            f'{rows / max(elapsed, 1e-9):.0f} строк/с без подписок'))
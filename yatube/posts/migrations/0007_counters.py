@@ -0,0 +1,67 @@
+# Generated by Django 4.0.5 on 2026-10-18 12:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    Follow = apps.get_model('posts', 'Follow')
+    Profile = apps.get_model('posts', 'Profile')
+
+    def count(model, field):
+        return Coalesce(models.Subquery(
+            model.objects.filter(**{field: models.OuterRef('pk')})
+            .order_by().values(field)
+            .annotate(total=models.Count('pk')).values('total'),
+            output_field=models.IntegerField()), 0)
+
+    Post.objects.update(comments_count=count(Comment, 'post'))
+    users = User.objects.annotate(
+        posts_total=count(Post, 'author'),
+        followers_total=count(Follow, 'author'),
+        following_total=count(Follow, 'user'),
+    )
+    Profile.objects.bulk_create(
+        (Profile(user_id=user.pk,
+                 posts_count=user.posts_total,
+                 followers_count=user.followers_total,
+                 following_count=user.following_total)
+         for user in users.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0006_auto_20220131_1345'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.CreateModel(
+            name='Profile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Постов')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='Подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Подписок')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Профиль',
+                'verbose_name_plural': 'Профили',
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
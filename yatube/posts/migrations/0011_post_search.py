@@ -0,0 +1,46 @@
+from django.db import migrations
+
+from posts.stemmer import stems
+
+FTS_TABLE = 'posts_post_fts'
+PG_INDEX = 'post_text_search_idx'
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX {PG_INDEX} ON posts_post '
+            "USING GIN (to_tsvector('russian', text))")
+    if vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+        "stems, tokenize = 'unicode61 remove_diacritics 2')")
+    Post = apps.get_model('posts', 'Post')
+    rows = [
+        (pk, ' '.join(stems(text)))
+        for pk, text in Post.objects.values_list('pk', 'text').iterator()
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, stems) VALUES (%s, %s)', rows)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {PG_INDEX}')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_thumbnails'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
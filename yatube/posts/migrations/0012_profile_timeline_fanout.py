@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+def set_fanout(apps, schema_editor):
+    Profile = apps.get_model('posts', 'Profile')
+    Profile.objects.filter(
+        followers_count__gte=settings.FOLLOW_FANOUT_LIMIT,
+    ).update(timeline_fanout=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_post_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='timeline_fanout',
+            field=models.BooleanField(default=True, verbose_name='Посты в лентах подписчиков'),
+        ),
+        migrations.RunPython(set_fanout, migrations.RunPython.noop),
+    ]
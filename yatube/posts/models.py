@@ -17,6 +17,17 @@ class Group(models.Model):
         return self.slug
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты для лент: автор и группа одним запросом, нужные поля."""
+        return self.select_related('author', 'group').only(
+            'id', 'text', 'pub_date', 'image', 'thumbnails',
+            'author__id', 'author__username',
+            'author__first_name', 'author__last_name',
+            'group__id', 'group__slug', 'group__title',
+        )
+
+
 class Post(models.Model):
     text = models.TextField(
         'Текст поста',
@@ -42,9 +53,29 @@ class Post(models.Model):
         'Картинка',
         upload_to='posts/',
         blank=True)
+    # URL миниатюр из THUMBNAIL_RENDITIONS, создаются при загрузке.
+    thumbnails = models.JSONField(
+        'Миниатюры',
+        default=dict,
+        blank=True,
+        editable=False)
+    comments_count = models.PositiveIntegerField(
+        'Комментариев',
+        default=0,
+        editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='post_pub_date_idx'),
+            models.Index(
+                fields=['author', '-pub_date'], name='post_author_date_idx'),
+            models.Index(
+                fields=['group', '-pub_date'], name='post_group_date_idx'),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -72,6 +103,10 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created']
+        indexes = [
+            models.Index(
+                fields=['post', '-created'], name='comment_post_created_idx'),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
@@ -92,6 +127,10 @@ class Follow(models.Model):
     )
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=['author', 'user'], name='follow_author_user_idx'),
+        ]
         constraints = [
             models.UniqueConstraint(
                 name="unique_following",
@@ -102,3 +141,58 @@ class Follow(models.Model):
                 check=~models.Q(user=models.F("author")),
             ),
         ]
+
+
+class Profile(models.Model):
+    """Счётчики пользователя, обновляемые вместе с постами и подписками."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Пользователь',
+        related_name='profile')
+    posts_count = models.PositiveIntegerField('Постов', default=0)
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+    following_count = models.PositiveIntegerField('Подписок', default=0)
+    # Раскладываются ли посты по лентам подписчиков (posts.timeline).
+    timeline_fanout = models.BooleanField(
+        'Посты в лентах подписчиков', default=True)
+
+    class Meta:
+        verbose_name = 'Профиль'
+        verbose_name_plural = 'Профили'
+
+    def __str__(self) -> str:
+        return str(self.user)
+
+
+class TimelineEntry(models.Model):
+    """Пост в ленте подписок пользователя, разложенный при публикации."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline')
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+')
+    # Копия post.pub_date: лента читается одним проходом по индексу.
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_date_idx'),
+            models.Index(
+                fields=['user', 'author'], name='timeline_user_author_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_timeline_post',
+                fields=['user', 'post'],
+            ),
+        ]
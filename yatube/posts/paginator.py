@@ -0,0 +1,169 @@
+import base64
+import binascii
+from collections.abc import Mapping, Sequence
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from core.caching import get_or_refresh
+
+
+def encode_cursor(obj, date_attr='pub_date'):
+    """Кодирует позицию записи в ленте: пару (дата, id).
+
+    Запись - объект модели или словарь из .values() с ключом id.
+    """
+    if isinstance(obj, Mapping):
+        date, pk = obj[date_attr], obj['id']
+    else:
+        date, pk = getattr(obj, date_attr), obj.pk
+    raw = f'{date.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Разбирает курсор обратно в (pub_date, id) или возвращает None."""
+    if not cursor:
+        return None
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(cursor + padding).decode()
+        pub_date, pk = raw.rsplit('|', 1)
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if pub_date is None:
+        return None
+    return pub_date, pk
+
+
+class CursorPage(Sequence):
+    """Страница ленты, выбранная по курсору, без COUNT(*) и OFFSET."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage {self.previous_cursor}..{self.next_cursor}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Постраничный вывод по ключу (pub_date, id).
+
+    «Более старые» записи выбираются условием по ключу после курсора,
+    «более новые» — до курсора, поэтому пропущенные строки не читаются
+    и общее количество записей не нужно.
+    """
+
+    def __init__(self, object_list, per_page, fields=('pub_date', 'pk'),
+                 date_attr='pub_date'):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        # Поля, по которым фильтруется и сортируется ключ. Значения в них
+        # должны совпадать с атрибутом date_attr и pk записи, например
+        # у денормализованной копии в таблице ленты подписок.
+        self.date_field, self.pk_field = fields
+        self.date_attr = date_attr
+
+    def _cursor(self, row):
+        return encode_cursor(row, self.date_attr)
+
+    def _older(self, position):
+        pub_date, pk = position
+        date, key = self.date_field, self.pk_field
+        return self.object_list.filter(
+            Q(**{f'{date}__lt': pub_date})
+            | Q(**{date: pub_date, f'{key}__lt': pk})
+        ).order_by(f'-{date}', f'-{key}')
+
+    def _newer(self, position):
+        pub_date, pk = position
+        date, key = self.date_field, self.pk_field
+        return self.object_list.filter(
+            Q(**{f'{date}__gt': pub_date})
+            | Q(**{date: pub_date, f'{key}__gt': pk})
+        ).order_by(date, key)
+
+    def _first(self):
+        return self.object_list.order_by(
+            f'-{self.date_field}', f'-{self.pk_field}')
+
+    def get_page(self, after=None, before=None):
+        """Возвращает страницу после курсора `after` или до `before`.
+
+        Некорректный курсор, как и у Paginator.get_page, даёт первую
+        страницу вместо ошибки.
+        """
+        position = decode_cursor(before)
+        if position is not None:
+            rows = list(self._newer(position)[:self.per_page + 1])
+            if rows:
+                has_more = len(rows) > self.per_page
+                rows = rows[:self.per_page][::-1]
+                return CursorPage(
+                    rows,
+                    next_cursor=self._cursor(rows[-1]),
+                    previous_cursor=self._cursor(rows[0]) if has_more
+                    else None,
+                )
+        position = decode_cursor(after)
+        if position is not None:
+            queryset = self._older(position)
+        else:
+            queryset = self._first()
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return CursorPage(
+            rows,
+            next_cursor=self._cursor(rows[-1]) if has_more else None,
+            previous_cursor=self._cursor(rows[0])
+            if position is not None and rows else None,
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """Постраничный вывод, берущий число объектов из кэша.
+
+    Число хранится под count_key вместе с версией содержимого ленты
+    (caching.feed_version): после нового или удалённого поста COUNT(*)
+    выполняет один запрос, остальные до его окончания получают прежнее
+    число (см. core.caching.get_or_refresh).
+    """
+
+    def __init__(self, object_list, per_page, count_key=None, version=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+        self.version = version
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return super().count
+        return get_or_refresh(
+            self.count_key, lambda: super(CachedCountPaginator, self).count,
+            settings.FEED_CACHE_TIMEOUT, self.version)
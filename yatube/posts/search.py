@@ -0,0 +1,154 @@
+"""Полнотекстовый поиск по постам.
+
+SQLite: таблица FTS5 FTS_TABLE с основами слов (posts.stemmer), rowid
+совпадает с id поста; синхронизируется сигналами, целиком
+перестраивается командой rebuild_search_index. PostgreSQL: GIN-индекс
+по to_tsvector('russian', text) из миграции, обновляется самой базой.
+На других базах - обычный поиск подстроки.
+"""
+import base64
+import binascii
+from itertools import islice
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+from .paginator import CursorPage
+from .stemmer import stems
+
+FTS_TABLE = 'posts_post_fts'
+PG_VECTOR = "to_tsvector('russian', posts_post.text)"
+PG_QUERY = "websearch_to_tsquery('russian', %s)"
+
+
+def _vendor():
+    return connection.vendor
+
+
+def match_expression(query):
+    """Запрос FTS5 из основ слов: все слова обязательны.
+
+    Основы берутся в кавычки, поэтому операторы FTS5 во вводе
+    пользователя не действуют.
+    """
+    return ' '.join(f'"{word}"' for word in stems(query))
+
+
+def index_post(post_id, text):
+    if _vendor() != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, stems) VALUES (%s, %s)',
+            [post_id, ' '.join(stems(text))])
+
+
+def unindex_post(post_id):
+    if _vendor() != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id])
+
+
+def rebuild_index(batch_size=1000):
+    """Заново заполняет FTS5 из всех постов; возвращает их число."""
+    if _vendor() != 'sqlite':
+        return 0
+    posts = (
+        Post.objects.order_by().values_list('pk', 'text')
+        .iterator(chunk_size=batch_size)
+    )
+    total = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        while batch := list(islice(posts, batch_size)):
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, stems) VALUES (%s, %s)',
+                [(pk, ' '.join(stems(text))) for pk, text in batch])
+            total += len(batch)
+    return total
+
+
+def filter_posts(queryset, query):
+    """Оставляет в queryset посты, найденные по запросу (без ранжирования).
+
+    Используется поиском в админке. Запрос без слов (одни знаки
+    препинания) ничего не находит: пустой MATCH - ошибка FTS5.
+    """
+    if not stems(query):
+        return queryset.none()
+    vendor = _vendor()
+    if vendor == 'sqlite':
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [match_expression(query)]))
+    if vendor == 'postgresql':
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT id FROM posts_post WHERE {PG_VECTOR} @@ {PG_QUERY}',
+            [query]))
+    return queryset.filter(text__icontains=query)
+
+
+def encode_cursor(score, pk):
+    raw = f'{score!r}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(cursor + padding).decode()
+        score, pk = raw.split('|')
+        return float(score), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def search_posts(query, per_page, after=None):
+    """Страница результатов поиска по релевантности, затем по id.
+
+    Постраничный вывод по курсору (score, id): следующая страница
+    выбирается условием по ключу, без OFFSET и COUNT(*).
+    """
+    position = decode_cursor(after)
+    if not stems(query):
+        return CursorPage([])
+    vendor = _vendor()
+    if vendor not in ('sqlite', 'postgresql'):
+        posts = list(
+            Post.objects.for_feed().filter(text__icontains=query)
+            .order_by('-pub_date', '-pk')[:per_page])
+        return CursorPage(posts)
+    if vendor == 'sqlite':
+        key, score = 'rowid', f'-bm25({FTS_TABLE})'
+        sql = (f'SELECT rowid, {score} FROM {FTS_TABLE} '
+               f'WHERE {FTS_TABLE} MATCH %s')
+        params = [match_expression(query)]
+    else:
+        # real из ts_rank приводится к float8: иначе значение из курсора
+        # (float8) не совпадает с рангом той же строки при сравнении.
+        key, score = 'id', f'ts_rank({PG_VECTOR}, {PG_QUERY})::float8'
+        sql = (f'SELECT id, {score} FROM posts_post '
+               f'WHERE {PG_VECTOR} @@ {PG_QUERY}')
+        params = [query, query]
+    if position is not None:
+        score_params = [query] if vendor == 'postgresql' else []
+        sql += f' AND ({score} < %s OR ({score} = %s AND {key} > %s))'
+        params += [*score_params, position[0], *score_params,
+                   position[0], position[1]]
+    sql += f' ORDER BY 2 DESC, 1 LIMIT {int(per_page) + 1}'
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    posts = Post.objects.for_feed().in_bulk([pk for pk, _ in rows])
+    return CursorPage(
+        [posts[pk] for pk, _ in rows if pk in posts],
+        next_cursor=encode_cursor(*rows[-1][::-1]) if has_more else None,
+        previous_cursor=after if position is not None else None,
+    )
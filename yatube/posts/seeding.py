@@ -0,0 +1,233 @@
+import math
+import os
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from io import BytesIO
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import default_storage
+from django.db.models import Max, Min
+from django.utils import timezone
+from PIL import Image
+
+from .models import Comment, Follow, Group, Post, User
+from .thumbnails import render_thumbnails
+from .timeline import backfill_followers, sync_fanout
+
+WORDS = (
+    'лев толстой война мир анна каренина роман глава князь бал москва '
+    'петербург письмо дорога поле лес река утро вечер дом сад память '
+    'разговор встреча осень зима весна лето друг семья история'
+).split()
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+# Даты постов и комментариев отсчитываются назад от этого момента,
+# а не от текущего времени: одинаковый seed даёт одинаковые данные.
+SEED_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@contextmanager
+def manual_dates(*models):
+    """Отключает auto_now_add, чтобы bulk_create сохранял заданные даты."""
+    fields = [
+        field for model in models for field in model._meta.fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def random_text(rnd, min_words=5, max_words=60):
+    return ' '.join(
+        rnd.choice(WORDS) for _ in range(rnd.randint(min_words, max_words)))
+
+
+def text_of_length(rnd, median_words, max_words):
+    """Текст логнормальной длины: в основном короткие, изредка длинные."""
+    words = round(rnd.lognormvariate(math.log(median_words), 0.8))
+    return ' '.join(rnd.choices(WORDS, k=min(max(words, 1), max_words)))
+
+
+def power_law_follows(rnd, user_ids, follows_per_user, exponent=1.0):
+    """Пары (подписчик, автор) с популярностью авторов по закону Ципфа.
+
+    Немногие авторы собирают большинство подписчиков; число подписок
+    пользователя распределено по Парето со средним follows_per_user.
+    """
+    authors = list(user_ids)
+    rnd.shuffle(authors)
+    weights = list(accumulate(
+        1 / rank ** exponent for rank in range(1, len(authors) + 1)))
+    for user_id in user_ids:
+        count = min(
+            int(rnd.paretovariate(2) * follows_per_user / 2),
+            len(authors) - 1)
+        chosen = rnd.choices(authors, cum_weights=weights, k=count)
+        for author_id in sorted(set(chosen) - {user_id}):
+            yield user_id, author_id
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed_data(users=100, groups=10, posts=1000, comments=1000,
+              follows_per_user=10, random_seed=0, batch_size=5000,
+              prefix='seed', progress=None, epoch=None):
+    """Заполняет базу данными для нагрузочных проверок через bulk_create.
+
+    Сигналы не срабатывают, поэтому счётчики после заполнения нужно
+    пересчитать (posts.counters.rebuild_counters). Даты лежат в трёх
+    годах до epoch (по умолчанию SEED_EPOCH).
+    """
+    rnd = random.Random(random_seed)
+    progress = progress or (lambda message: None)
+    password = make_password(None)
+
+    User.objects.bulk_create(
+        (User(username=f'{prefix}_user_{i}', password=password)
+         for i in range(users)),
+        batch_size=batch_size)
+    user_ids = list(
+        User.objects.filter(username__startswith=f'{prefix}_user_')
+        .order_by('pk').values_list('pk', flat=True))
+    progress(f'Пользователей: {len(user_ids)}')
+
+    Group.objects.bulk_create(
+        Group(title=f'Группа {i}', slug=f'{prefix}-group-{i}',
+              description=random_text(rnd))
+        for i in range(groups))
+    group_ids = list(
+        Group.objects.filter(slug__startswith=f'{prefix}-group-')
+        .order_by('pk').values_list('pk', flat=True)) + [None]
+    progress(f'Групп: {len(group_ids) - 1}')
+
+    now = epoch or SEED_EPOCH
+    step = timedelta(days=3 * 365) / max(posts, 1)
+    last_post = Post.objects.aggregate(last=Max('pk'))['last'] or 0
+    with manual_dates(Post, Comment):
+        created = 0
+        for batch in batched(range(posts), batch_size):
+            Post.objects.bulk_create(
+                Post(author_id=rnd.choice(user_ids),
+                     group_id=rnd.choice(group_ids),
+                     text=text_of_length(rnd, 40, 1000),
+                     pub_date=now - step * (posts - i))
+                for i in batch)
+            created += len(batch)
+            progress(f'Постов: {created}')
+        # Посты одной пачки вставлены подряд: их id идут без пропусков.
+        # Первый id берётся из базы: последовательность PostgreSQL
+        # не откатывается вместе с транзакцией и может уйти вперёд.
+        new_ids = Post.objects.filter(pk__gt=last_post).aggregate(
+            low=Min('pk'), high=Max('pk'))
+        low, high = new_ids['low'], new_ids['high']
+        created = 0
+        for batch in batched(range(comments if low is not None else 0),
+                             batch_size):
+            Comment.objects.bulk_create(
+                Comment(post_id=rnd.randint(low, high),
+                        author_id=rnd.choice(user_ids),
+                        text=text_of_length(rnd, 10, 200),
+                        created=now - timedelta(
+                            seconds=rnd.randint(0, 3 * 365 * 86400)))
+                for _ in batch)
+            created += len(batch)
+            progress(f'Комментариев: {created}')
+
+    follows = (
+        Follow(user_id=user_id, author_id=author_id)
+        for user_id, author_id in power_law_follows(
+            rnd, user_ids, follows_per_user)
+    )
+    for batch in batched(follows, batch_size):
+        Follow.objects.bulk_create(batch, ignore_conflicts=True)
+    progress(f'Подписок: {Follow.objects.count()}')
+    return user_ids
+
+
+def seed_images(count, random_seed=0, prefix='seed', progress=None):
+    """Добавляет картинки с готовыми миниатюрами к count последним постам.
+
+    Файлы пишутся в default_storage, поэтому MEDIA_ROOT стоит заранее
+    направить во временный каталог.
+    """
+    rnd = random.Random(random_seed)
+    progress = progress or (lambda message: None)
+    posts = Post.objects.only('pk', 'image').order_by('-pub_date')[:count]
+    for number, post in enumerate(posts, 1):
+        picture = Image.new(
+            'RGB', (rnd.randint(400, 1200), rnd.randint(300, 900)),
+            tuple(rnd.randint(0, 255) for _ in range(3)))
+        buffer = BytesIO()
+        picture.save(buffer, 'JPEG')
+        post.image = default_storage.save(
+            f'posts/{prefix}_{post.pk}.jpg', ContentFile(buffer.getvalue()))
+        Post.objects.filter(pk=post.pk).update(
+            image=post.image.name, thumbnails=render_thumbnails(post.image))
+        progress(f'Картинок: {number}')
+
+
+def attach_images(count, source, random_seed=0, prefix='seed',
+                  progress=None):
+    """Раздаёт картинки из каталога source count последним постам.
+
+    Каждый файл копируется в default_storage и получает миниатюры один
+    раз, посты ссылаются на общие копии: так тысячи постов с картинками
+    заполняются за несколько запросов. Возвращает число постов.
+    """
+    if not count:
+        return 0
+    rnd = random.Random(random_seed)
+    progress = progress or (lambda message: None)
+    names = sorted(
+        name for name in os.listdir(source)
+        if name.lower().endswith(IMAGE_SUFFIXES))
+    if not names:
+        return 0
+    images = []
+    for name in names:
+        with open(os.path.join(source, name), 'rb') as image_file:
+            stored = default_storage.save(
+                f'posts/{prefix}_{name}', File(image_file))
+        images.append((stored, render_thumbnails(stored)))
+    post_ids = list(
+        Post.objects.order_by('-pub_date', '-pk')
+        .values_list('pk', flat=True)[:count])
+    chosen = {}
+    for post_id in post_ids:
+        chosen.setdefault(rnd.randrange(len(images)), []).append(post_id)
+    for index, ids in sorted(chosen.items()):
+        image, thumbnails = images[index]
+        for batch in batched(ids, 900):
+            Post.objects.filter(pk__in=batch).update(
+                image=image, thumbnails=thumbnails)
+    progress(f'Постов с картинками: {len(post_ids)}')
+    return len(post_ids)
+
+
+def fill_timelines(progress=None):
+    """Заполняет ленты подписок после заполнения в обход сигналов."""
+    progress = progress or (lambda message: None)
+    sync_fanout()
+    authors = (
+        Follow.objects.exclude(author__profile__timeline_fanout=False)
+        .order_by().values_list('author_id', flat=True).distinct()
+    )
+    for number, author_id in enumerate(authors.iterator(), 1):
+        backfill_followers(author_id)
+        progress(f'Лент авторов: {number}')
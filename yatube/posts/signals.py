@@ -0,0 +1,115 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import bump_post_versions, bump_version
+from .counters import change_comments_counter, change_profile_counter
+from .models import Comment, Follow, Group, Post
+from .search import index_post, unindex_post
+from .tasks import warm_feed_cache
+from .timeline import backfill, fan_out, trim
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_group(sender, instance, **kwargs):
+    """Запоминает прежнюю группу поста, чтобы сбросить и её ленту."""
+    instance._previous_group_id = None
+    if instance.pk is not None:
+        instance._previous_group_id = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list('group_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    """Сбрасывает версии лент, в которые попадает пост."""
+    bump_post_versions(
+        instance, getattr(instance, '_previous_group_id', None))
+    warm_feed_cache.delay(unique=True)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, **kwargs):
+    index_post(instance.pk, instance.text)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow_feed(sender, instance, **kwargs):
+    """Сбрасывает ленту подписок пользователя при изменении подписок."""
+    bump_version(f'follow:{instance.user_id}')
+    bump_version(f'followers:{instance.author_id}')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_post_comments(sender, instance, **kwargs):
+    """Сдвигает версию поста: на его странице новый список комментариев."""
+    bump_version(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group(sender, instance, created, **kwargs):
+    """Сдвигает версию группы после правки её названия или описания."""
+    if not created:
+        bump_version(f'group:{instance.pk}')
+
+
+@receiver(post_save, sender=Post)
+def count_created_post(sender, instance, created, **kwargs):
+    if created:
+        change_profile_counter(instance.author_id, 'posts_count', 1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    change_profile_counter(instance.author_id, 'posts_count', -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_created_comment(sender, instance, created, **kwargs):
+    if created:
+        change_comments_counter(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    change_comments_counter(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_created_follow(sender, instance, created, **kwargs):
+    if created:
+        change_profile_counter(instance.author_id, 'followers_count', 1)
+        change_profile_counter(instance.user_id, 'following_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(sender, instance, **kwargs):
+    change_profile_counter(instance.author_id, 'followers_count', -1)
+    change_profile_counter(instance.user_id, 'following_count', -1)
+
+
+# Ленты подписок обновляются после счётчиков: от числа подписчиков
+# автора зависит, раскладываются ли его посты при записи.
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    if created:
+        fan_out(instance)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, **kwargs):
+    if created:
+        backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def trim_timeline(sender, instance, **kwargs):
+    trim(instance.user_id, instance.author_id)
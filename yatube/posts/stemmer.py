@@ -0,0 +1,93 @@
+"""Стеммер русского языка по алгоритму Snowball (Портер).
+
+Нужен для полнотекстового поиска на SQLite: FTS5 не умеет стемминг
+русского, поэтому в индекс и в запрос попадают уже обрезанные основы.
+"""
+import re
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = re.compile(
+    r'((ив|ивши|ившись|ыв|ывши|ывшись)|((?<=[ая])(в|вши|вшись)))$')
+REFLEXIVE = re.compile(r'(с[яь])$')
+ADJECTIVE = re.compile(
+    r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|'
+    r'ую|юю|ая|яя|ою|ею)$')
+PARTICIPLE = re.compile(r'((ивш|ывш|ующ)|((?<=[ая])(ем|нн|вш|ющ|щ)))$')
+VERB = re.compile(
+    r'((ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|'
+    r'ено|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю)|'
+    r'((?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно)))$')
+NOUN = re.compile(
+    r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем|'
+    r'ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$')
+DERIVATIONAL = re.compile(r'ость?$')
+SUPERLATIVE = re.compile(r'(ейше|ейш)$')
+WORD = re.compile(r'\w+')
+CYRILLIC = re.compile(r'^[а-я]+$')
+
+
+def _region(word):
+    """Часть слова после первого сочетания «гласная + согласная» (R1)."""
+    for index in range(1, len(word)):
+        if word[index - 1] in VOWELS and word[index] not in VOWELS:
+            return index + 1
+    return len(word)
+
+
+def _strip_ending(rv):
+    """Шаг 1: окончание деепричастия, прилагательного, глагола или
+    существительного."""
+    rv, found = PERFECTIVE_GERUND.subn('', rv)
+    if found:
+        return rv
+    rv = REFLEXIVE.sub('', rv)
+    rv, found = ADJECTIVE.subn('', rv)
+    if found:
+        return PARTICIPLE.sub('', rv)
+    rv, found = VERB.subn('', rv)
+    if found:
+        return rv
+    return NOUN.sub('', rv)
+
+
+def _strip_tail(rv):
+    """Шаг 4: двойное «н», превосходная степень и мягкий знак."""
+    if rv.endswith('нн'):
+        return rv[:-1]
+    rv, found = SUPERLATIVE.subn('', rv)
+    if found and rv.endswith('нн'):
+        return rv[:-1]
+    if rv.endswith('ь'):
+        return rv[:-1]
+    return rv
+
+
+def stem(word):
+    """Основа слова; слова не на кириллице возвращаются как есть."""
+    word = word.lower().replace('ё', 'е')
+    if not CYRILLIC.match(word):
+        return word
+    start = next(
+        (index + 1 for index, char in enumerate(word) if char in VOWELS),
+        None)
+    if start is None:
+        return word
+    head, rv = word[:start], _strip_ending(word[start:])
+
+    if rv.endswith('и'):
+        rv = rv[:-1]
+
+    # Словообразовательный суффикс снимается только в области R2.
+    r1 = _region(word)
+    r2 = r1 + _region(word[r1:])
+    match = DERIVATIONAL.search(rv)
+    if match and start + match.start() >= r2:
+        rv = rv[:match.start()]
+
+    return head + _strip_tail(rv)
+
+
+def stems(text):
+    """Основы всех слов текста в исходном порядке."""
+    return [stem(word) for word in WORD.findall(text)]
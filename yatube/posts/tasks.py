@@ -0,0 +1,37 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test.client import RequestFactory
+from django.urls import reverse
+
+from core.jobs import task
+from . import timeline
+from .counters import rebuild_counters
+from .thumbnails import process_post_image
+
+
+@task('posts.process_image')
+def process_image(post_id):
+    """Очистка загруженной картинки и создание миниатюр."""
+    process_post_image(post_id)
+
+
+@task('posts.restore_fanout')
+def restore_fanout(author_id):
+    """Снова раскладывает посты автора, потерявшего подписчиков."""
+    timeline.restore_fanout(author_id)
+
+
+@task('posts.warm_feed_cache', max_attempts=1)
+def warm_feed_cache():
+    """Заполняет кэш первой страницы главной ленты для гостей."""
+    from .views import index
+
+    request = RequestFactory().get(reverse('posts:index'))
+    request.user = AnonymousUser()
+    index(request)
+
+
+@task('posts.rebuild_counters', max_attempts=1, atomic=False)
+def rebuild_counters_job():
+    """Периодическая сверка денормализованных счётчиков; исправления
+    фиксируются пачками."""
+    rebuild_counters()
@@ -0,0 +1,114 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(POSTS_IN_PAGE=3, COMMENTS_PER_PAGE=2)
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='')
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, text=f'Пост {i}',
+                group=cls.group if i % 2 else None)
+            for i in range(7)
+        ]
+        for i in range(3):
+            Comment.objects.create(
+                post=cls.posts[0], author=cls.reader, text=f'Ответ {i}')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        # У автора несколько подписчиков: в ленте подписок каждый пост
+        # должен встретиться один раз.
+        for i in range(2):
+            Follow.objects.create(
+                user=User.objects.create_user(username=f'fan{i}'),
+                author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def walk(self, url):
+        ids, after = [], None
+        while True:
+            data = self.client.get(url, {'after': after} if after else {})
+            data = data.json()
+            ids += [row['id'] for row in data['results']]
+            after = data['next']
+            if not after:
+                return ids
+
+    def test_index_walks_every_post_once(self):
+        ids = self.walk(reverse('api:index'))
+        self.assertEqual(ids, [post.pk for post in reversed(self.posts)])
+
+    def test_post_fields(self):
+        data = self.client.get(reverse('api:index')).json()['results'][0]
+        self.assertEqual(
+            set(data), {'id', 'text', 'pub_date', 'author', 'group',
+                        'image', 'thumbnails'})
+        self.assertEqual(data['author'], 'author')
+        self.assertEqual(data['group'], None)
+
+    def test_group_and_profile_feeds(self):
+        group_ids = self.walk(
+            reverse('api:group_posts', kwargs={'slug': 'group'}))
+        self.assertEqual(len(group_ids), 3)
+        profile_ids = self.walk(
+            reverse('api:profile_posts', kwargs={'username': 'author'}))
+        self.assertEqual(len(profile_ids), 7)
+        for name, kwargs in (('api:group_posts', {'slug': 'missing'}),
+                             ('api:profile_posts', {'username': 'missing'}),
+                             ('api:post_detail', {'post_id': 10 ** 6})):
+            with self.subTest(name=name):
+                self.assertEqual(
+                    self.client.get(reverse(name, kwargs=kwargs)).status_code,
+                    404)
+
+    def test_follow_feed_requires_login(self):
+        url = reverse('api:follow_posts')
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.client.force_login(self.reader)
+        self.assertEqual(
+            self.walk(url), [post.pk for post in reversed(self.posts)])
+
+    def test_post_detail_and_comments(self):
+        post = self.posts[0]
+        data = self.client.get(
+            reverse('api:post_detail', kwargs={'post_id': post.pk})).json()
+        self.assertEqual(data['comments_count'], 3)
+        comments = self.walk(
+            reverse('api:post_comments', kwargs={'post_id': post.pk}))
+        self.assertEqual(len(comments), 3)
+
+    def test_comment_changes_post_etag(self):
+        url = reverse('api:post_detail', kwargs={'post_id': self.posts[1].pk})
+        response = self.client.get(url)
+        Comment.objects.create(
+            post=self.posts[1], author=self.reader, text='Новый ответ')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['comments_count'], 1)
+
+    def test_etag_gives_not_modified(self):
+        url = reverse('api:index')
+        response = self.client.get(url)
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+            304)
+
+    def test_limit_is_capped(self):
+        with override_settings(API_MAX_PAGE_SIZE=5):
+            data = self.client.get(reverse('api:index'), {'limit': 50}).json()
+        self.assertEqual(len(data['results']), 5)
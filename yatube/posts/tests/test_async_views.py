@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import Http404
+from django.test import AsyncRequestFactory, TransactionTestCase
+from django.urls import reverse
+
+from posts import async_views
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class AsyncViewsTests(TransactionTestCase):
+    """Запросы к базе идут из других потоков, поэтому данные должны быть
+    зафиксированы: TransactionTestCase вместо TestCase."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='')
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text='Асинхронный пост')
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий')
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.factory = AsyncRequestFactory()
+
+    def request(self, url, user=None, **meta):
+        request = self.factory.get(url)
+        request.META.update(meta)
+        request.user = user or AnonymousUser()
+        return request
+
+    async def test_feeds_render_posts(self):
+        cases = (
+            (async_views.index, reverse('posts:index'), {}),
+            (async_views.group_post,
+             reverse('posts:group_post', args=['group']), {'slug': 'group'}),
+            (async_views.profile,
+             reverse('posts:profile', args=['author']),
+             {'username': 'author'}),
+            (async_views.post_detail,
+             reverse('posts:post_detail', args=[self.post.pk]),
+             {'post_id': self.post.pk}),
+        )
+        for view, url, kwargs in cases:
+            with self.subTest(url=url):
+                response = await view(
+                    self.request(url, self.reader), **kwargs)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('Асинхронный пост', response.content.decode())
+
+    async def test_profile_shows_follow_status(self):
+        url = reverse('posts:profile', args=['author'])
+        response = await async_views.profile(
+            self.request(url, self.reader), username='author')
+        self.assertIn('Отписаться', response.content.decode())
+
+    async def test_not_modified(self):
+        url = reverse('posts:index')
+        response = await async_views.index(self.request(url))
+        response = await async_views.index(
+            self.request(url, HTTP_IF_NONE_MATCH=response['ETag']))
+        self.assertEqual(response.status_code, 304)
+
+    async def test_missing_group(self):
+        with self.assertRaises(Http404):
+            await async_views.group_post(
+                self.request('/group/missing/'), slug='missing')
+
+    async def test_follow_index(self):
+        url = reverse('posts:follow_index')
+        response = await async_views.follow_index(self.request(url))
+        self.assertEqual(response.status_code, 302)
+        response = await async_views.follow_index(
+            self.request(url, self.reader))
+        self.assertIn('Асинхронный пост', response.content.decode())
@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from posts.benchmark import bench_routes, check_budget, percentile
+from posts.counters import rebuild_counters
+from posts.seeding import fill_timelines, seed_data
+
+User = get_user_model()
+
+
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user_ids = seed_data(
+            users=5, groups=2, posts=30, comments=30, follows_per_user=2)
+        rebuild_counters(fix=True)
+        fill_timelines()
+        cls.user = User.objects.get(pk=user_ids[0])
+
+    def test_every_route_is_measured(self):
+        results = bench_routes(self.user, repeat=2)
+        routes = {result['route'] for result in results}
+        self.assertIn('posts:index', routes)
+        self.assertIn('posts:post_edit', routes)
+        self.assertIn('users:login', routes)
+        self.assertIn('about:tech', routes)
+        for result in results:
+            with self.subTest(route=result['route']):
+                self.assertLess(result['status'], 400)
+                self.assertGreater(result['p95_ms'], 0)
+                self.assertGreaterEqual(result['p95_ms'], result['p50_ms'])
+
+    def test_budget_is_checked_per_route(self):
+        results = [
+            {'route': 'posts:index', 'queries': 3, 'sql_ms': 1,
+             'template_ms': 1, 'p50_ms': 5, 'p95_ms': 9},
+            {'route': 'about:tech', 'queries': 2, 'sql_ms': 1,
+             'template_ms': 1, 'p50_ms': 5, 'p95_ms': 9},
+        ]
+        budgets = {'*': {'queries': 2}, 'about:tech': {'p95_ms': 8}}
+        self.assertEqual(
+            check_budget(results, budgets),
+            [('posts:index', 'queries', 3, 2),
+             ('about:tech', 'p95_ms', 9, 8)])
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile([7], 95), 7)
@@ -76,10 +76,32 @@ class PostViewTests(TestCase):
             follow=True
         )
         post_case = Post.objects.first()
-        """Проверили, что поста на странице нет"""
-        response_1 = self.client.get(reverse(self.page))
-        self.assertNotIn(post_case.text, response_1.content.decode())
-        """Проверили, в кэше данные остались"""
+        """Новый пост сбрасывает версию ленты и виден сразу"""
+        response = self.client.get(reverse(self.page))
+        self.assertIn(post_case.text, response.content.decode())
+        self.assertIn(post_case, response.context.get('page_obj'))
+
+    def test_cache_index_keeps_fragment_until_change(self):
         cache.clear()
-        response_2 = self.client.get(reverse(self.page))
-        self.assertIn(post_case, response_2.context.get('page_obj'))
+        post_case = Post.objects.first()
+        self.client.get(reverse(self.page))
+        """Изменение в обход сигналов: в кэше остался прежний текст"""
+        Post.objects.filter(pk=post_case.pk).update(text='Не из кэша')
+        response = self.client.get(reverse(self.page))
+        self.assertIn(post_case.text, response.content.decode())
+        self.assertNotIn('Не из кэша', response.content.decode())
+        """Сохранение поста сбрасывает кэш ленты"""
+        post_case.refresh_from_db()
+        post_case.save()
+        response = self.client.get(reverse(self.page))
+        self.assertIn('Не из кэша', response.content.decode())
+
+    @override_settings(POSTS_IN_PAGE=5)
+    def test_cache_index_varies_by_page(self):
+        cache.clear()
+        response_1 = self.client.get(reverse(self.page))
+        response_2 = self.client.get(reverse(self.page) + '?page=2')
+        for post in response_2.context.get('page_obj'):
+            self.assertIn(post.text, response_2.content.decode())
+            self.assertNotIn(
+                f'<p>{post.text}</p>', response_1.content.decode())
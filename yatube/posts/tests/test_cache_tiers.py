@@ -0,0 +1,136 @@
+import time
+
+from django.core.cache import cache, caches
+from django.test import TestCase, override_settings
+
+from core.cache import LocalCache
+from core.caching import get_or_refresh
+from core.replicas import ReplicaRouter, RequestState, _state
+from posts.caching import VERSION_KEY, bump_version, feed_version
+
+TWO_LEVEL_CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.TwoLevelCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {'L1_MAX_ENTRIES': 3, 'L1_TIMEOUT': 60},
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'two-level-tests',
+    },
+}
+
+
+class LocalCacheTests(TestCase):
+    def test_least_recently_used_is_evicted(self):
+        local = LocalCache(max_entries=2, timeout=60)
+        local.set('a', 1)
+        local.set('b', 2)
+        local.get('a')
+        local.set('c', 3)
+        self.assertEqual(local.get('a'), 1)
+        self.assertEqual(local.get('c'), 3)
+        self.assertEqual(len(local), 2)
+
+    def test_entries_expire(self):
+        local = LocalCache(max_entries=2, timeout=0.01)
+        local.set('a', 1)
+        time.sleep(0.02)
+        local.get('a')
+        self.assertEqual(len(local), 0)
+
+    def test_values_are_copies(self):
+        local = LocalCache(max_entries=2, timeout=60)
+        value = {'posts': [1]}
+        local.set('a', value)
+        value['posts'].append(2)
+        local.get('a')['posts'].append(3)
+        self.assertEqual(local.get('a'), {'posts': [1]})
+
+
+@override_settings(CACHES=TWO_LEVEL_CACHES, CACHE_EARLY_REFRESH_BETA=0)
+class TwoLevelCacheTests(TestCase):
+    """Другой процесс изображает запись прямо в общий кэш (caches['shared']),
+    мимо L1 этого процесса."""
+
+    def setUp(self):
+        cache.clear()
+        self.shared = caches['shared']
+
+    def test_reads_are_served_from_process_memory(self):
+        cache.set('fragment', 'старый')
+        self.shared.set('fragment', 'новый')
+        self.assertEqual(cache.get('fragment'), 'старый')
+        self.assertEqual(cache.get_many(['fragment']), {'fragment': 'старый'})
+
+    def test_writes_go_to_shared_cache(self):
+        cache.set('fragment', 'значение')
+        cache.set_many({'a': 1, 'b': 2})
+        self.assertEqual(self.shared.get('fragment'), 'значение')
+        self.assertEqual(self.shared.get_many(['a', 'b']), {'a': 1, 'b': 2})
+        cache.delete('fragment')
+        self.assertIsNone(self.shared.get('fragment'))
+        self.assertIsNone(cache.get('fragment'))
+
+    def test_misses_are_filled_from_shared_cache(self):
+        self.shared.set('fragment', 'значение')
+        self.assertEqual(cache.get('fragment'), 'значение')
+        self.shared.delete('fragment')
+        self.assertEqual(cache.get('fragment'), 'значение')
+        self.assertEqual(cache.get('missing', 'нет'), 'нет')
+
+    def test_versions_are_always_read_from_shared_cache(self):
+        before = feed_version('posts')
+        self.shared.incr(VERSION_KEY.format('posts'))
+        self.assertNotEqual(feed_version('posts'), before)
+
+    def test_add_is_decided_by_shared_cache(self):
+        self.shared.set('lock', 1)
+        self.assertFalse(cache.add('lock', 1))
+        self.shared.delete('lock')
+        self.assertTrue(cache.add('lock', 1))
+        self.assertFalse(cache.add('lock', 1))
+
+    def test_stale_local_copy_is_reread_on_new_version(self):
+        get_or_refresh('fragment', lambda: 'версия 1', 60, version=1)
+        # Другой процесс пересчитал фрагмент для версии 2.
+        self.shared.set(
+            'fragment', ('версия 2', 2, time.time() + 60, 0.0), 120)
+        compute_calls = []
+
+        def compute():
+            compute_calls.append(1)
+            return 'пересчитано'
+
+        self.assertEqual(
+            get_or_refresh('fragment', compute, 60, version=2), 'версия 2')
+        self.assertEqual(compute_calls, [])
+        self.assertEqual(
+            get_or_refresh('fragment', compute, 60, version=2), 'версия 2')
+
+    def test_bump_version_invalidates_fragments_of_all_processes(self):
+        version = feed_version('posts')
+        get_or_refresh('index', lambda: 'старая лента', 60, version=version)
+        bump_version('posts')
+        self.assertEqual(
+            get_or_refresh(
+                'index', lambda: 'новая лента', 60,
+                version=feed_version('posts')),
+            'новая лента')
+
+
+class CacheRoutingTests(TestCase):
+    def test_database_cache_uses_primary(self):
+        class CacheEntry:
+            class _meta:
+                app_label = 'django_cache'
+
+        router = ReplicaRouter()
+        state = RequestState(replica='replica')
+        token = _state.set(state)
+        try:
+            with override_settings(DATABASE_REPLICAS=['replica']):
+                self.assertEqual(router.db_for_write(CacheEntry), 'default')
+                self.assertFalse(state.wrote)
+        finally:
+            _state.reset(token)
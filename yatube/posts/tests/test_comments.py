@@ -0,0 +1,75 @@
+import re
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Post
+from posts.seeding import manual_dates
+
+User = get_user_model()
+
+
+@override_settings(COMMENTS_PER_PAGE=20)
+class CommentPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+        cls.commenters = [
+            User.objects.create_user(username=f'reader{i}') for i in range(3)]
+        now = timezone.now()
+        with manual_dates(Comment):
+            Comment.objects.bulk_create(
+                Comment(post=cls.post, author=cls.commenters[i % 3],
+                        text=f'Комментарий {i}',
+                        created=now - timedelta(minutes=i // 2))
+                for i in range(45))
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk})
+
+    def test_first_page_is_limited(self):
+        response = self.client.get(self.url)
+        comments = response.context['comments']
+        self.assertEqual(len(comments), 20)
+        self.assertTrue(comments.has_next())
+        self.assertContains(response, 'Показать ещё')
+
+    def test_queries_do_not_depend_on_comment_count(self):
+        def count():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(self.url)
+            return len(queries)
+
+        before = count()
+        Comment.objects.bulk_create(
+            Comment(post=self.post, author=self.author, text='Ещё')
+            for _ in range(100))
+        self.assertEqual(count(), before)
+
+    def test_json_endpoint_loads_the_rest(self):
+        url = reverse('posts:post_comments', kwargs={'post_id': self.post.pk})
+        page = self.client.get(self.url).context['comments']
+        texts = [comment.text for comment in page]
+        after = page.next_cursor
+        while after:
+            data = self.client.get(url, {'after': after}).json()
+            texts += re.findall(r'Комментарий \d+', data['html'])
+            after = data['next']
+        self.assertEqual(
+            sorted(texts), sorted(f'Комментарий {i}' for i in range(45)))
+
+    def test_json_endpoint_for_missing_post(self):
+        url = reverse('posts:post_comments', kwargs={'post_id': 10 ** 6})
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+from .fixtures.constant_post import test_group
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title=test_group['title'],
+            slug=test_group['slug'],
+            description=test_group['description'],
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Пост')
+        cls.urls = {
+            'index': reverse('posts:index'),
+            'group_post': reverse(
+                'posts:group_post', kwargs={'slug': cls.group.slug}),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': 'author'}),
+            'post_detail': reverse(
+                'posts:post_detail', kwargs={'post_id': cls.post.pk}),
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def revalidate(self, url, response):
+        return self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'],
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+    def test_unchanged_pages_return_304(self):
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    self.revalidate(url, response).status_code, 304)
+
+    def test_304_skips_feed_query(self):
+        url = self.urls['index']
+        response = self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.revalidate(url, response).status_code, 304)
+
+    def test_new_post_changes_feeds(self):
+        responses = {
+            name: self.client.get(url) for name, url in self.urls.items()
+        }
+        Post.objects.create(
+            author=self.author, group=self.group, text='Новый')
+        for name in ('index', 'group_post', 'profile', 'post_detail'):
+            with self.subTest(page=name):
+                url = self.urls[name]
+                self.assertEqual(
+                    self.revalidate(url, responses[name]).status_code, 200)
+
+    def test_comment_changes_post_detail(self):
+        url = self.urls['post_detail']
+        response = self.client.get(url)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий')
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_validators_depend_on_user_and_follows(self):
+        url = self.urls['profile']
+        anonymous = self.client.get(url)
+        self.client.force_login(self.reader)
+        self.assertEqual(self.revalidate(url, anonymous).status_code, 200)
+        response = self.client.get(url)
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_author_following_changes_profile(self):
+        url = self.urls['profile']
+        response = self.client.get(url)
+        Follow.objects.create(user=self.author, author=self.reader)
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_if_modified_since_alone(self):
+        url = self.urls['index']
+        response = self.client.get(url)
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+            ).status_code,
+            304)
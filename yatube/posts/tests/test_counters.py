@@ -0,0 +1,116 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.counters import get_profile, rebuild_counters
+from posts.models import Comment, Follow, Post, Profile
+from .fixtures.constant_post import test_comment, test_post_text
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.user = User.objects.create_user(username='follower')
+
+    def setUp(self):
+        self.auth_client = Client()
+        self.auth_client.force_login(self.user)
+
+    def profile(self, user):
+        return Profile.objects.get(user=user)
+
+    def test_posts_counter_follows_create_and_delete(self):
+        posts = [
+            Post.objects.create(author=self.author, text=test_post_text)
+            for _ in range(3)
+        ]
+        self.assertEqual(self.profile(self.author).posts_count, 3)
+        posts[0].delete()
+        self.assertEqual(self.profile(self.author).posts_count, 2)
+
+    def test_comments_counter_follows_view_and_delete(self):
+        post = Post.objects.create(author=self.author, text=test_post_text)
+        self.auth_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.pk}),
+            data={'text': test_comment})
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        Comment.objects.filter(post=post).delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_follow_counters_follow_views(self):
+        self.auth_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': 'author'}))
+        self.assertEqual(self.profile(self.author).followers_count, 1)
+        self.assertEqual(self.profile(self.user).following_count, 1)
+        self.auth_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': 'author'}))
+        self.assertEqual(self.profile(self.author).followers_count, 0)
+        self.assertEqual(self.profile(self.user).following_count, 0)
+
+    def test_profile_reads_counter_instead_of_count(self):
+        Post.objects.create(author=self.author, text=test_post_text)
+        response = self.auth_client.get(reverse(
+            'posts:profile', kwargs={'username': 'author'}))
+        self.assertEqual(response.context['post_count'], 1)
+        """Счётчик берётся из профиля, а не из COUNT по постам"""
+        Profile.objects.filter(user=self.author).update(posts_count=42)
+        response = self.auth_client.get(reverse(
+            'posts:profile', kwargs={'username': 'author'}))
+        self.assertEqual(response.context['post_count'], 42)
+
+    def test_missing_profile_is_created_from_tables(self):
+        Post.objects.bulk_create(
+            Post(author=self.author, text=test_post_text) for _ in range(4))
+        Follow.objects.create(user=self.user, author=self.author)
+        Profile.objects.filter(user=self.author).delete()
+        author = User.objects.get(pk=self.author.pk)
+        profile = get_profile(author)
+        self.assertEqual(profile.posts_count, 4)
+        self.assertEqual(profile.followers_count, 1)
+
+    def test_rebuild_counters_reports_and_fixes_drift(self):
+        post = Post.objects.create(author=self.author, text=test_post_text)
+        Post.objects.filter(pk=post.pk).update(comments_count=7)
+        Profile.objects.filter(user=self.author).update(posts_count=5)
+        out = StringIO()
+        call_command('rebuild_counters', '--dry-run', stdout=out)
+        self.assertIn('Расхождений: 2', out.getvalue())
+        self.assertEqual(self.profile(self.author).posts_count, 5)
+        call_command('rebuild_counters', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        self.assertEqual(self.profile(self.author).posts_count, 1)
+        out = StringIO()
+        call_command('rebuild_counters', stdout=out)
+        self.assertIn('Расхождений: 0', out.getvalue())
+
+    def test_rebuild_counters_writes_only_counter_columns(self):
+        Post.objects.create(author=self.author, text=test_post_text)
+        Profile.objects.filter(user=self.author).update(
+            posts_count=5, timeline_fanout=False)
+        get_profile(self.user)
+        Profile.objects.filter(user=self.user).update(following_count=3)
+        with CaptureQueriesContext(connection) as captured:
+            drift = rebuild_counters(batch_size=1)
+        self.assertEqual(len(drift), 2)
+        updates = [
+            query['sql'] for query in captured
+            if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        for sql in updates:
+            self.assertNotIn('timeline_fanout', sql)
+        profile = self.profile(self.author)
+        self.assertEqual(profile.posts_count, 1)
+        self.assertFalse(profile.timeline_fanout)
+        self.assertEqual(self.profile(self.user).following_count, 0)
@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.export import resume_position
+from posts.models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, text=f'Строка 1\nСтрока "{i}"')
+            for i in range(5)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(
+            lambda: [os.remove(os.path.join(self.directory, name))
+                     for name in os.listdir(self.directory)])
+
+    def export(self, *args):
+        out = StringIO()
+        call_command('export_content', *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_ndjson_export(self):
+        rows = [json.loads(line) for line in self.export('posts').splitlines()]
+        self.assertEqual([row['id'] for row in rows],
+                         [post.pk for post in self.posts])
+        self.assertEqual(rows[0]['author'], 'author')
+        self.assertEqual(rows[0]['text'], self.posts[0].text)
+
+    def test_csv_export_keeps_multiline_text(self):
+        rows = list(csv.reader(io.StringIO(
+            self.export('posts', '--format', 'csv'), newline='')))
+        self.assertEqual(rows[0][:3], ['id', 'author', 'group'])
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][3], self.posts[0].text)
+
+    def test_after_id(self):
+        output = self.export(
+            'posts', '--after-id', str(self.posts[2].pk))
+        self.assertEqual(len(output.splitlines()), 2)
+
+    def test_resume_interrupted_file(self):
+        for export_format in ('ndjson', 'csv'):
+            with self.subTest(format=export_format):
+                path = os.path.join(self.directory, f'posts.{export_format}')
+                self.export('posts', '--format', export_format,
+                            '--output', path)
+                with open(path, 'rb') as export_file:
+                    full = export_file.read()
+                # Выгрузка оборвалась посреди четвёртой строки.
+                with open(path, 'wb') as export_file:
+                    cut = full.index(b'"3')
+                    export_file.write(full[:cut])
+                self.assertEqual(
+                    resume_position(path, export_format)[0],
+                    self.posts[2].pk)
+                self.export('posts', '--format', export_format,
+                            '--output', path, '--resume')
+                with open(path, 'rb') as export_file:
+                    self.assertEqual(export_file.read(), full)
+
+    def test_view_is_staff_only_and_streams(self):
+        client = Client()
+        url = reverse('posts:export', kwargs={'kind': 'follows'})
+        self.assertEqual(client.get(url).status_code, 302)
+        client.force_login(self.staff)
+        response = client.get(url, {'format': 'csv'})
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('reader,author', content)
+        response = client.get(reverse(
+            'posts:export', kwargs={'kind': 'comments'}),
+            {'after_id': Comment.objects.get().pk})
+        self.assertEqual(b''.join(response.streaming_content), b'')
+        self.assertEqual(
+            client.get(reverse(
+                'posts:export', kwargs={'kind': 'users'})).status_code,
+            404)
@@ -8,7 +8,8 @@ from django.conf import settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 
-from posts.models import Group, Post
+from posts.forms import PostForm
+from posts.models import Comment, Group, Post
 from .fixtures.constant_post import test_post_text, test_group
 
 User = get_user_model()
@@ -97,6 +98,21 @@ class PostFormTests(TestCase):
         self.assertEqual(post.group, self.post.group)
         self.assertNotEqual(post.text, post_old.text)
 
+    def test_edit_post_keeps_concurrent_comments_count(self):
+        """Правка поста не затирает счётчик комментариев, изменённый
+        после того, как пост был прочитан."""
+        post = Post.objects.get(pk=self.post.pk)
+        form = PostForm(
+            data={'text': 'Исправленный текст', 'group': self.group.pk},
+            instance=post)
+        Comment.objects.create(
+            post=self.post, author=self.user, text='Комментарий')
+        self.assertTrue(form.is_valid())
+        form.save()
+        post.refresh_from_db()
+        self.assertEqual(post.text, 'Исправленный текст')
+        self.assertEqual(post.comments_count, 1)
+
     def test_creat_post_image_content(self):
         post_count = Post.objects.count()
         small_gif = (
@@ -0,0 +1,125 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase
+
+from posts.caching import get_versions
+from posts.models import Comment, Follow, Group, Post, TimelineEntry
+from posts.search import search_posts
+
+User = get_user_model()
+
+
+class ImportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(
+            lambda: [os.remove(os.path.join(self.directory, name))
+                     for name in os.listdir(self.directory)])
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8', newline='') as source:
+            source.write(content)
+        return path
+
+    def load(self, *args):
+        out = StringIO()
+        call_command('import_content', *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_import_posts_and_comments(self):
+        posts = self.write('posts.ndjson', (
+            '{"id": 100, "author": "author", "group": "group", '
+            '"text": "Старые письма", "pub_date": "2020-01-01T10:00:00Z"}\n'
+            '{"id": 101, "author": "newcomer", "group": "new-group", '
+            '"text": "Второй пост", "pub_date": "2020-01-02T10:00:00Z"}\n'
+        ))
+        comments = self.write('comments.csv', (
+            'id,post,author,text,created\n'
+            '7,100,reader,"Первая строка\nвторая",2020-01-03T10:00:00Z\n'
+        ))
+        version = get_versions('posts', f'author:{self.author.pk}')
+        output = self.load('posts', posts, '--batch-size', '1')
+        self.assertIn('новых пользователей: 1, новых групп: 1', output)
+        self.load('comments', comments)
+
+        post = Post.objects.get(pk=100)
+        self.assertEqual(post.group, self.group)
+        self.assertEqual(post.pub_date.year, 2020)
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(
+            Post.objects.get(pk=101).author.username, 'newcomer')
+        self.assertEqual(
+            Comment.objects.get(pk=7).text, 'Первая строка\nвторая')
+        self.assertEqual(self.author.profile.posts_count, 1)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post_id=100).exists())
+        self.assertEqual(
+            [found.pk for found in search_posts('письмо', 10)], [100])
+        self.assertNotEqual(
+            get_versions('posts', f'author:{self.author.pk}'), version)
+
+    def test_new_posts_get_ids_after_imported(self):
+        self.load('posts', self.write(
+            'posts.ndjson', '{"id": 500, "author": "author", "text": "Т"}\n'))
+        post = Post.objects.create(author=self.author, text='Новый')
+        self.assertGreater(post.pk, 500)
+
+    def test_bad_record_reports_line_and_keeps_loaded_batches(self):
+        posts = self.write('posts.ndjson', (
+            '{"id": 300, "author": "author", "text": "Первый"}\n'
+            '\n'
+            '{"id": 301, "author": "author", "text": \n'
+            '{"id": 302, "author": "author", "text": "Третий"}\n'
+        ))
+        with self.assertRaisesMessage(CommandError, 'строка 3'):
+            self.load('posts', posts, '--batch-size', '1')
+        self.assertEqual(
+            list(Post.objects.values_list('pk', flat=True)), [300])
+        self.assertEqual(self.author.profile.posts_count, 1)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post_id=300).exists())
+
+    def test_missing_field_is_reported(self):
+        comments = self.write('comments.csv', (
+            'id,author,text\n'
+            '8,reader,Без поста\n'
+        ))
+        with self.assertRaisesMessage(
+                CommandError, "строка 2: нет поля 'post'"):
+            self.load('comments', comments)
+        self.assertFalse(Comment.objects.exists())
+
+
+class ImportIntegrityTests(TransactionTestCase):
+    """Внешние ключи проверяются при фиксации пачки, поэтому без
+    транзакции теста вокруг."""
+
+    def test_integrity_error_reports_batch_lines(self):
+        User.objects.create_user(username='reader')
+        path = os.path.join(tempfile.mkdtemp(), 'comments.ndjson')
+        self.addCleanup(os.remove, path)
+        with open(path, 'w', encoding='utf-8') as source:
+            source.write(
+                '{"id": 9, "post": 999, "author": "reader", "text": "Т"}\n'
+                '{"id": 10, "post": 999, "author": "reader", "text": "Т"}\n')
+        with self.assertRaisesMessage(CommandError, 'строки 1-2'):
+            call_command(
+                'import_content', 'comments', path,
+                stdout=StringIO(), stderr=StringIO())
+        self.assertFalse(Comment.objects.exists())
@@ -0,0 +1,171 @@
+import json
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from core.jobs import claim, enqueue, queue_depth, run_pending, task
+from core.models import Job
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+calls = []
+
+
+@task('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task('tests.broken', max_attempts=2)
+def broken():
+    raise RuntimeError('сломано')
+
+
+@override_settings(JOBS_EAGER=False, JOBS_RETRY_DELAY=0)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueued_job_runs_once(self):
+        record.delay(1)
+        self.assertEqual(queue_depth()['pending'], 1)
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, [1])
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(run_pending(), 0)
+
+    def test_unique_job_is_not_duplicated(self):
+        record.delay(2, unique=True)
+        record.delay(2, unique=True)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_claimed_job_is_not_taken_twice(self):
+        record.delay(3)
+        self.assertEqual(len(claim()), 1)
+        self.assertEqual(claim(), [])
+        self.assertEqual(queue_depth()['running'], 1)
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        broken.delay()
+        run_pending()
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertIn('сломано', job.last_error)
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(queue_depth()['failed'], 1)
+
+    def test_delayed_job_waits(self):
+        enqueue('tests.record', 4,
+                run_after=timezone.now() + timezone.timedelta(hours=1))
+        self.assertEqual(run_pending(), 0)
+        self.assertGreater(
+            Job.objects.filter(status=Job.PENDING).count(), 0)
+
+    def test_run_jobs_command(self):
+        record.delay(5)
+        out = StringIO()
+        call_command('run_jobs', '--stats', stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['pending'], 1)
+        call_command('run_jobs', '--once', stdout=StringIO())
+        self.assertEqual(calls, [5])
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, JOBS_EAGER=False,
+                   IMAGE_MAX_SIZE=200)
+class PostJobsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def jpeg_with_exif(self):
+        picture = Image.new('RGB', (800, 400), 'green')
+        exif = Image.Exif()
+        exif[0x010F] = 'Камера автора'
+        buffer = BytesIO()
+        picture.save(buffer, 'JPEG', exif=exif)
+        return SimpleUploadedFile(
+            name='photo.jpg', content=buffer.getvalue(),
+            content_type='image/jpeg')
+
+    def test_upload_is_processed_by_worker(self):
+        self.client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Фото', 'image': self.jpeg_with_exif()})
+        post = Post.objects.get(text='Фото')
+        self.assertEqual(post.thumbnails, {})
+        self.assertTrue(Job.objects.filter(name='posts.process_image'))
+        call_command('run_jobs', '--once', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(
+            set(post.thumbnails), set(settings.THUMBNAIL_RENDITIONS))
+        with post.image.open() as image_file:
+            picture = Image.open(image_file)
+            self.assertLessEqual(max(picture.size), 200)
+            self.assertEqual(len(picture.getexif()), 0)
+
+    def upload(self):
+        self.client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Фото', 'image': self.jpeg_with_exif()})
+        post = Post.objects.get(text='Фото')
+        return post, post.image.name
+
+    def test_original_is_deleted_after_commit(self):
+        post, original = self.upload()
+        with self.captureOnCommitCallbacks(execute=True):
+            run_pending()
+        post.refresh_from_db()
+        self.assertNotEqual(post.image.name, original)
+        self.assertTrue(default_storage.exists(post.image.name))
+        self.assertFalse(default_storage.exists(original))
+
+    def test_failed_processing_keeps_original(self):
+        post, original = self.upload()
+        with mock.patch(
+                'django.core.files.storage.FileSystemStorage.save',
+                side_effect=OSError('нет места')):
+            with self.captureOnCommitCallbacks(execute=True):
+                run_pending()
+        post.refresh_from_db()
+        self.assertEqual(post.image.name, original)
+        self.assertTrue(default_storage.exists(original))
+
+    def test_post_save_warms_index_cache(self):
+        Post.objects.create(author=self.user, text='Тёплый кэш')
+        Post.objects.create(author=self.user, text='Тёплый кэш 2')
+        self.assertEqual(
+            Job.objects.filter(name='posts.warm_feed_cache').count(), 1)
+        run_pending()
+        # Фрагмент ленты и число постов уже в кэше.
+        with self.assertNumQueries(0):
+            response = Client().get(reverse('posts:index'))
+        self.assertContains(response, 'Тёплый кэш 2')
@@ -0,0 +1,124 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.core.cache import cache
+
+from posts.models import Group, Post
+from posts.paginator import CursorPage, decode_cursor
+from .fixtures.constant_post import test_group
+
+User = get_user_model()
+
+
+@override_settings(POSTS_PAGINATION='cursor', POSTS_IN_PAGE=10)
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title=test_group['title'],
+            slug=test_group['slug'],
+            description=test_group['description'],
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, group=cls.group, text=f'Текст{i}')
+            for i in range(23)
+        )
+        """Половина постов с одинаковой датой: порядок задает id"""
+        first = Post.objects.order_by('pk').first()
+        Post.objects.filter(pk__lte=first.pk + 11).update(
+            pub_date=first.pub_date)
+        cls.urls = [
+            reverse('posts:index'),
+            reverse('posts:group_post', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.user.username}),
+        ]
+
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def walk(self, url):
+        """Проходит ленту по ссылкам «старее» до конца."""
+        seen = []
+        response = self.client.get(url)
+        page = response.context['page_obj']
+        seen.extend(page)
+        while page.has_next():
+            response = self.client.get(f'{url}?after={page.next_cursor}')
+            page = response.context['page_obj']
+            seen.extend(page)
+        return seen, page
+
+    def test_cursor_walks_whole_feed_in_order(self):
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        for url in self.urls:
+            with self.subTest(url=url):
+                seen, last_page = self.walk(url)
+                self.assertEqual(seen, expected)
+                self.assertEqual(len(last_page), 3)
+                self.assertIsInstance(last_page, CursorPage)
+
+    def test_cursor_newer_link_returns_previous_page(self):
+        url = self.urls[0]
+        first = self.client.get(url).context['page_obj']
+        second = self.client.get(
+            f'{url}?after={first.next_cursor}').context['page_obj']
+        self.assertTrue(second.has_previous())
+        back = self.client.get(
+            f'{url}?before={second.previous_cursor}').context['page_obj']
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+
+    def test_cursor_page_has_no_count_and_offset(self):
+        url = self.urls[0]
+        first = self.client.get(url).context['page_obj']
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'{url}?after={first.next_cursor}')
+        sql = ' '.join(query['sql'] for query in queries).upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_broken_cursor_returns_first_page(self):
+        self.assertIsNone(decode_cursor('не-курсор'))
+        response = self.client.get(f'{self.urls[0]}?after=broken')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+
+@override_settings(POSTS_PAGINATION='pages', POSTS_IN_PAGE=1,
+                   PAGINATOR_WINDOW=2)
+class WindowPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Текст{i}') for i in range(50))
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_only_window_of_pages_is_rendered(self):
+        response = self.client.get(reverse('posts:index'), {'page': 25})
+        content = response.content.decode()
+        for number in (1, 23, 24, 26, 27, 50):
+            self.assertIn(f'?page={number}"', content)
+        for number in (2, 22, 28, 49):
+            self.assertNotIn(f'?page={number}"', content)
+        self.assertIn('…', content)
+
+    def test_page_count_is_cached_until_feed_changes(self):
+        url = reverse('posts:index')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {'page': 2})
+        self.assertFalse(
+            [q for q in queries if 'COUNT(' in q['sql'].upper()])
+        Post.objects.create(author=self.user, text='Новый')
+        response = self.client.get(url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 51)
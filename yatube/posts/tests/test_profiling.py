@@ -0,0 +1,63 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.profiling import collect, reset
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(PROFILING_SAMPLE_RATE=1)
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        reset()
+        self.client = Client()
+
+    def test_request_time_is_split_by_view(self):
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        stats = collect()['posts:index']
+        self.assertEqual(stats['requests'], 2)
+        self.assertGreater(stats['queries'], 0)
+        self.assertGreater(stats['db_ms'], 0)
+        self.assertGreater(stats['template_ms'], 0)
+        self.assertGreater(stats['cache_ms'], 0)
+        parts = sum(
+            stats[f'{part}_ms']
+            for part in ('db', 'template', 'cache', 'python'))
+        self.assertAlmostEqual(parts, stats['wall_ms'], delta=0.1)
+
+    @override_settings(PROFILING_SAMPLE_RATE=0)
+    def test_disabled_when_rate_is_zero(self):
+        Client().get(reverse('posts:index'))
+        self.assertEqual(collect(), {})
+
+    def test_endpoint_is_staff_only(self):
+        self.client.get(reverse('posts:index'))
+        response = self.client.get(reverse('profiling'))
+        self.assertEqual(response.status_code, 302)
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('profiling'))
+        self.assertIn('posts:index', response.json()['views'])
+
+    def test_dump_command(self):
+        self.client.get(reverse('about:author'))
+        out = StringIO()
+        call_command('profiling_stats', '--json', stdout=out)
+        self.assertIn('about:author', json.loads(out.getvalue()))
+        call_command('profiling_stats', '--reset', stdout=StringIO())
+        self.assertEqual(collect(), {})
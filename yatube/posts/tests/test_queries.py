@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post
+from .fixtures.constant_post import test_group
+
+User = get_user_model()
+
+
+class FeedQueriesTests(TestCase):
+    """Число запросов ленты не зависит от количества постов на странице."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой')
+        cls.group = Group.objects.create(
+            title=test_group['title'],
+            slug=test_group['slug'],
+            description=test_group['description'],
+        )
+        cls.feeds = {
+            'index': reverse('posts:index'),
+            'group': reverse(
+                'posts:group_post', kwargs={'slug': cls.group.slug}),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': cls.author.username}),
+            'follow': reverse('posts:follow_index'),
+        }
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def add_posts(self, count):
+        """Посты разных авторов и автора профиля, на всех подписан reader."""
+        start = Post.objects.count()
+        for i in range(start, start + count):
+            other = User.objects.create_user(username=f'writer{i}')
+            Follow.objects.create(user=self.reader, author=other)
+            Post.objects.create(author=other, group=self.group, text=f'{i}')
+            Post.objects.create(
+                author=self.author, group=self.group, text=f'{i}')
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_feed_queries_do_not_grow_with_posts(self):
+        self.add_posts(1)
+        single = {
+            name: self.count_queries(url) for name, url in self.feeds.items()
+        }
+        self.add_posts(5)
+        for name, url in self.feeds.items():
+            with self.subTest(feed=name):
+                self.assertEqual(self.count_queries(url), single[name])
+
+    def test_for_feed_fetches_author_and_group_at_once(self):
+        self.add_posts(3)
+        posts = list(Post.objects.for_feed())
+        with self.assertNumQueries(0):
+            for post in posts:
+                post.author.get_full_name()
+                str(post.author)
+                str(post.group)
+                post.text
+                post.pub_date
+                post.image
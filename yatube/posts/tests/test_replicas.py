@@ -0,0 +1,66 @@
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import (RequestFactory, TransactionTestCase,
+                         override_settings)
+
+from core.replicas import PIN_COOKIE, ReplicaMiddleware, ReplicaRouter
+from posts.models import Post
+
+router = ReplicaRouter()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_PIN_SECONDS=10)
+class ReplicaRouterTests(TransactionTestCase):
+    """Без обёртки TestCase в транзакцию: внутри неё чтение всегда идёт
+    с основной базы."""
+
+    def handle(self, request, view):
+        reads = []
+
+        def get_response(request):
+            view(reads)
+            reads.append(router.db_for_read(Post))
+            return HttpResponse()
+
+        response = ReplicaMiddleware(get_response)(request)
+        return reads, response
+
+    def test_outside_request_uses_primary(self):
+        self.assertEqual(router.db_for_read(Post), 'default')
+        self.assertEqual(router.db_for_write(Post), 'default')
+
+    def test_get_reads_from_replica(self):
+        reads, response = self.handle(
+            RequestFactory().get('/'), lambda reads: None)
+        self.assertEqual(reads, ['replica'])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_write_pins_to_primary(self):
+        def follow(reads):
+            reads.append(router.db_for_read(Post))
+            router.db_for_write(Post)
+
+        reads, response = self.handle(RequestFactory().get('/'), follow)
+        self.assertEqual(reads, ['replica', 'default'])
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 10)
+
+        request = RequestFactory().get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        reads, _ = self.handle(request, lambda reads: None)
+        self.assertEqual(reads, ['default'])
+
+    def test_post_and_transactions_use_primary(self):
+        reads, _ = self.handle(
+            RequestFactory().post('/'), lambda reads: None)
+        self.assertEqual(reads, ['default'])
+
+        def in_transaction(reads):
+            with transaction.atomic():
+                reads.append(router.db_for_read(Post))
+
+        reads, _ = self.handle(RequestFactory().get('/'), in_transaction)
+        self.assertEqual(reads, ['default', 'replica'])
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(router.allow_migrate('replica', 'posts'))
+        self.assertIsNone(router.allow_migrate('default', 'posts'))
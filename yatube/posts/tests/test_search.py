@@ -0,0 +1,108 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.admin import PostAdmin
+from posts.models import Post
+from posts.search import filter_posts, search_posts
+from posts.stemmer import stem
+
+User = get_user_model()
+
+
+class StemmerTests(TestCase):
+    def test_word_forms_share_stem(self):
+        for forms in (('война', 'войны', 'войной'),
+                      ('книга', 'книгами', 'книги'),
+                      ('красивый', 'красивая', 'красивейший')):
+            with self.subTest(forms=forms):
+                self.assertEqual(len({stem(word) for word in forms}), 1)
+
+    def test_non_cyrillic_word_is_kept(self):
+        self.assertEqual(stem('Django'), 'django')
+
+
+@override_settings(POSTS_IN_PAGE=2)
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.war = Post.objects.create(
+            author=cls.author, text='Роман о войне и мире')
+        cls.books = [
+            Post.objects.create(
+                author=cls.author, text=f'Книги о войне, часть {i}')
+            for i in range(3)
+        ]
+        cls.other = Post.objects.create(author=cls.author, text='Осенний лес')
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_search_finds_other_word_forms(self):
+        page = search_posts('войны', per_page=10)
+        self.assertEqual(set(page), {self.war, *self.books})
+
+    def test_all_words_are_required(self):
+        page = search_posts('война мир', per_page=10)
+        self.assertEqual(list(page), [self.war])
+
+    def test_ranked_results_are_cursor_paginated(self):
+        url = reverse('posts:search')
+        response = self.client.get(url, {'q': 'война'})
+        seen = list(response.context['page_obj'])
+        page = response.context['page_obj']
+        while page.has_next():
+            page = self.client.get(
+                url, {'q': 'война', 'after': page.next_cursor},
+            ).context['page_obj']
+            seen.extend(page)
+        self.assertEqual(len(seen), 4)
+        self.assertEqual(set(seen), {self.war, *self.books})
+
+    def test_index_follows_edits_and_deletes(self):
+        self.other.text = 'Зимний лес'
+        self.other.save()
+        self.assertEqual(list(search_posts('зима', per_page=10)), [])
+        self.assertEqual(
+            list(search_posts('зимний', per_page=10)), [self.other])
+        self.other.delete()
+        self.assertEqual(list(search_posts('зимний', per_page=10)), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        response = self.client.get(
+            reverse('posts:search'), {'q': '"войн* OR NEAR('})
+        self.assertEqual(response.status_code, 200)
+
+    def test_admin_search_uses_index(self):
+        self.assertIn('text', PostAdmin.search_fields)
+        self.assertEqual(
+            set(filter_posts(Post.objects.all(), 'книгами')),
+            set(self.books))
+
+    def test_punctuation_only_query_finds_nothing(self):
+        self.assertEqual(list(filter_posts(Post.objects.all(), '!!!')), [])
+        self.assertEqual(list(search_posts('!!!', per_page=10)), [])
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': '!!!'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_rebuild_command_restores_bulk_inserted_posts(self):
+        if connection.vendor != 'sqlite':
+            # На PostgreSQL индекс - выражение над text, его не обходят.
+            self.skipTest('Индекс FTS5 есть только у SQLite.')
+        post = Post.objects.bulk_create(
+            [Post(author=self.author, text='Поэма о дорогах')])[0]
+        self.assertEqual(list(search_posts('дорога', per_page=10)), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(
+            [p.pk for p in search_posts('дорога', per_page=10)], [post.pk])
@@ -0,0 +1,74 @@
+import random
+import shutil
+import tempfile
+from collections import Counter
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from posts.models import Comment, Follow, Group, Post, Profile, User
+from posts.search import search_posts
+from posts.seeding import (SEED_EPOCH, power_law_follows, seed_data,
+                           text_of_length)
+
+
+class SeedingTests(TestCase):
+    def test_follow_graph_is_skewed_and_deterministic(self):
+        user_ids = list(range(1, 201))
+        pairs = list(power_law_follows(random.Random(1), user_ids, 10))
+        self.assertEqual(
+            pairs, list(power_law_follows(random.Random(1), user_ids, 10)))
+        self.assertFalse(any(user == author for user, author in pairs))
+        followers = Counter(author for _, author in pairs)
+        top = sum(count for _, count in followers.most_common(20))
+        self.assertGreater(top, len(pairs) / 2)
+
+    def test_text_length_varies(self):
+        rnd = random.Random(0)
+        lengths = [
+            len(text_of_length(rnd, 40, 1000).split()) for _ in range(500)]
+        self.assertLessEqual(max(lengths), 1000)
+        self.assertLess(min(lengths), 20)
+        self.assertGreater(max(lengths), 100)
+
+    def test_same_seed_gives_same_data(self):
+        def seeded(prefix):
+            seed_data(users=5, groups=2, posts=30, comments=20,
+                      follows_per_user=2, random_seed=3, prefix=prefix)
+            authors = {'author__username__startswith': f'{prefix}_'}
+            return (
+                list(Post.objects.filter(**authors).order_by('pk')
+                     .values_list('text', 'pub_date')),
+                list(Comment.objects.filter(**authors).order_by('pk')
+                     .values_list('text', 'created')))
+
+        posts, comments = seeded('first')
+        self.assertEqual((posts, comments), seeded('second'))
+        newest = max(date for _, date in posts)
+        self.assertLess(newest, SEED_EPOCH)
+        self.assertGreater(newest, SEED_EPOCH - timedelta(days=365))
+
+    def test_seed_command(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source, ignore_errors=True)
+        Image.new('RGB', (50, 40), 'red').save(f'{source}/red.png')
+        with override_settings(MEDIA_ROOT=media_root):
+            call_command(
+                'seed_yatube', '--users', '20', '--groups', '3',
+                '--posts', '200', '--comments', '100', '--follows', '4',
+                '--images', '10', '--images-from', source,
+                stdout=StringIO())
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 100)
+        self.assertTrue(Follow.objects.exists())
+        self.assertEqual(Post.objects.exclude(image='').count(), 10)
+        self.assertEqual(
+            sum(Profile.objects.values_list('posts_count', flat=True)), 200)
+        self.assertTrue(search_posts('война', 5))
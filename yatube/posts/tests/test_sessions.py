@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.sessions import NoSession
+from posts.models import Group, User
+
+
+class SessionlessViewsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+
+    def session_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, [
+            query for query in queries if 'django_session' in query['sql']]
+
+    def test_anonymous_feed_reader_has_no_session(self):
+        for url in (reverse('posts:index'),
+                    reverse('posts:group_post', args=[self.group.slug])):
+            with self.subTest(url=url):
+                response, queries = self.session_queries(url)
+                self.assertEqual(queries, [])
+                self.assertIsInstance(response.wsgi_request.session, NoSession)
+                self.assertFalse(response.wsgi_request.user.is_authenticated)
+                self.assertNotIn(
+                    settings.SESSION_COOKIE_NAME, response.cookies)
+                self.assertIn('Cookie', response['Vary'])
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db')
+    def test_session_cookie_is_still_read(self):
+        self.client.force_login(self.user)
+        response, queries = self.session_queries(reverse('posts:index'))
+        self.assertTrue(response.wsgi_request.user.is_authenticated)
+        self.assertEqual(len(queries), 1)
+
+    def test_other_views_keep_sessions(self):
+        response = self.client.get(reverse('about:author'))
+        self.assertNotIsInstance(response.wsgi_request.session, NoSession)
+
+    @override_settings(
+        SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+    def test_cached_db_reads_session_from_cache(self):
+        self.client.force_login(self.user)
+        _, queries = self.session_queries(reverse('posts:index'))
+        self.assertEqual(queries, [])
+        self.assertTrue(Session.objects.exists())
+
+    @override_settings(
+        SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookies_need_no_session_table(self):
+        self.client.force_login(self.user)
+        response, queries = self.session_queries(reverse('posts:index'))
+        self.assertEqual(queries, [])
+        self.assertTrue(response.wsgi_request.user.is_authenticated)
+        self.assertFalse(Session.objects.exists())
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+
+from core.sqlite import pragma_statements
+
+
+class SqlitePragmaTests(TestCase):
+    def test_busy_timeout_goes_first(self):
+        self.assertEqual(
+            pragma_statements(
+                {'synchronous': 'NORMAL', 'journal_mode': 'WAL',
+                 'busy_timeout': 5000}),
+            ['PRAGMA busy_timeout = 5000', 'PRAGMA journal_mode = WAL',
+             'PRAGMA synchronous = NORMAL'])
+
+    def test_pragmas_are_applied_to_connection(self):
+        if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+            self.skipTest('Только для SQLite с SQLITE_PRAGMAS.')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute('PRAGMA synchronous')
+            # 1 - NORMAL.
+            self.assertEqual(cursor.fetchone()[0], 1)
@@ -0,0 +1,96 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+
+from core.caching import LOCK_KEY, get_or_refresh
+
+
+class Counter:
+    def __init__(self, value='значение'):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f'{self.value} {self.calls}'
+
+
+@override_settings(CACHE_EARLY_REFRESH_BETA=0, CACHE_LOCK_WAIT=0.1)
+class GetOrRefreshTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_value_is_computed_once(self):
+        compute = Counter()
+        self.assertEqual(get_or_refresh('key', compute, 60), 'значение 1')
+        self.assertEqual(get_or_refresh('key', compute, 60), 'значение 1')
+        self.assertEqual(compute.calls, 1)
+
+    def test_new_version_is_recomputed(self):
+        compute = Counter()
+        get_or_refresh('key', compute, 60, version=1)
+        self.assertEqual(
+            get_or_refresh('key', compute, 60, version=2), 'значение 2')
+
+    def test_stale_value_is_served_while_another_rebuilds(self):
+        compute = Counter()
+        get_or_refresh('key', compute, 60, version=1)
+        cache.add(LOCK_KEY.format('key'), 1)
+        self.assertEqual(
+            get_or_refresh('key', compute, 60, version=2), 'значение 1')
+        self.assertEqual(compute.calls, 1)
+
+    def test_missing_value_waits_for_lock_then_computes(self):
+        compute = Counter()
+        cache.add(LOCK_KEY.format('key'), 1)
+        self.assertEqual(get_or_refresh('key', compute, 60), 'значение 1')
+
+    @override_settings(CACHE_EARLY_REFRESH_BETA=10 ** 9)
+    def test_early_refresh_before_expiry(self):
+        compute = Counter()
+        get_or_refresh('key', compute, 60)
+        self.assertEqual(get_or_refresh('key', compute, 60), 'значение 2')
+
+    def test_zero_timeout_disables_cache(self):
+        compute = Counter()
+        get_or_refresh('key', compute, 0)
+        get_or_refresh('key', compute, 0)
+        self.assertEqual(compute.calls, 2)
+        self.assertIsNone(cache.get('key'))
+
+    def test_template_tag_uses_version(self):
+        template = Template(
+            '{% load stampede %}'
+            '{% stampede_cache 60 feed key version=version %}'
+            '{{ text }}{% endstampede_cache %}')
+        render = (
+            lambda text, version: template.render(Context(
+                {'key': 'index', 'version': version, 'text': text})))
+        self.assertEqual(render('первый', 1), 'первый')
+        self.assertEqual(render('второй', 1), 'первый')
+        self.assertEqual(render('третий', 2), 'третий')
+
+
+class SharedCacheTests(TestCase):
+    def test_works_with_file_cache(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        file_cache = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.'
+                           'FileBasedCache',
+                'LOCATION': location,
+            },
+        }
+        with override_settings(CACHES=file_cache):
+            compute = Counter()
+            get_or_refresh('key', compute, 60, version=1)
+            cache.add(LOCK_KEY.format('key'), 1)
+            self.assertEqual(
+                get_or_refresh('key', compute, 60, version=2), 'значение 1')
+            cache.delete(LOCK_KEY.format('key'))
+            self.assertEqual(
+                get_or_refresh('key', compute, 60, version=2), 'значение 2')
@@ -0,0 +1,85 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def png_upload(name='picture.png'):
+    buffer = BytesIO()
+    Image.new('RGB', (400, 300), 'navy').save(buffer, 'PNG')
+    return SimpleUploadedFile(
+        name=name, content=buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, JOBS_EAGER=True)
+class ThumbnailsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def create_post(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('posts:post_create'),
+                data={'text': 'Пост с картинкой', 'image': png_upload()})
+        return Post.objects.get(text='Пост с картинкой')
+
+    def test_thumbnails_created_on_upload(self):
+        post = self.create_post()
+        self.assertEqual(
+            set(post.thumbnails), set(settings.THUMBNAIL_RENDITIONS))
+        for url in post.thumbnails.values():
+            self.assertTrue(url.startswith(settings.MEDIA_URL))
+
+    def test_feeds_render_without_thumbnail_backend(self):
+        post = self.create_post()
+        pages = [
+            reverse('posts:index'),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+        ]
+        target = 'sorl.thumbnail.templatetags.thumbnail.get_thumbnail'
+        with mock.patch(target, side_effect=AssertionError) as thumbnail:
+            for url in pages:
+                with self.subTest(url=url):
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+        thumbnail.assert_not_called()
+        response = self.client.get(pages[0])
+        self.assertContains(response, post.thumbnails['feed'])
+
+    def test_edit_with_new_image_replaces_thumbnails(self):
+        post = self.create_post()
+        old = post.thumbnails
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+                data={'text': post.text, 'image': png_upload('other.png')})
+        post.refresh_from_db()
+        self.assertEqual(set(post.thumbnails), set(old))
+        self.assertNotEqual(post.thumbnails, old)
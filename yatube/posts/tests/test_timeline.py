@@ -0,0 +1,120 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.jobs import run_pending
+from core.models import Job
+from posts.models import Follow, Post, TimelineEntry
+from posts.timeline import follow_feed, is_fanned_out
+from .fixtures.constant_post import test_post_text
+
+User = get_user_model()
+RESTORE = 'posts.restore_fanout'
+
+
+@override_settings(FOLLOW_TIMELINE=True, FOLLOW_FANOUT_LIMIT=3)
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.url = reverse('posts:follow_index')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def feed(self, **params):
+        response = self.client.get(self.url, params)
+        return list(response.context['page_obj'])
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text=test_post_text)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists())
+        self.assertEqual(self.feed(), [post])
+
+    def test_follow_backfills_and_unfollow_trims(self):
+        posts = [
+            Post.objects.create(author=self.author, text=test_post_text)
+            for _ in range(3)
+        ]
+        self.client.get(reverse(
+            'posts:profile_follow', kwargs={'username': 'author'}))
+        self.assertEqual(
+            set(self.feed()), set(posts))
+        self.client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': 'author'}))
+        self.assertFalse(TimelineEntry.objects.filter(user=self.reader))
+        self.assertEqual(self.feed(), [])
+
+    @override_settings(FOLLOW_FANOUT_HYSTERESIS=1, JOBS_EAGER=False)
+    def test_popular_author_is_merged_on_read(self):
+        followers = [self.reader] + [
+            User.objects.create_user(username=f'fan{i}') for i in range(2)]
+        for follower in followers:
+            Follow.objects.create(user=follower, author=self.author)
+        post = Post.objects.create(author=self.author, text=test_post_text)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(self.feed(), [post])
+        """Ниже границы, но в пределах запаса - всё ещё при чтении"""
+        Follow.objects.filter(user=followers[-1]).delete()
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertFalse(Job.objects.filter(name=RESTORE).exists())
+        self.assertEqual(self.feed(), [post])
+        """Автор стал «обычным»: посты раскладываются задачей"""
+        Follow.objects.filter(user=followers[-2]).delete()
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(self.feed(), [post])
+        self.assertTrue(Job.objects.filter(name=RESTORE).exists())
+        run_pending()
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists())
+        self.assertTrue(is_fanned_out(self.author.pk))
+        self.assertEqual(self.feed(), [post])
+
+    @override_settings(FOLLOW_FANOUT_HYSTERESIS=1, JOBS_EAGER=False)
+    def test_follows_at_the_limit_do_not_refill_timelines(self):
+        fans = [
+            User.objects.create_user(username=f'fan{i}') for i in range(2)]
+        for follower in [self.reader, *fans]:
+            Follow.objects.create(user=follower, author=self.author)
+        Post.objects.create(author=self.author, text=test_post_text)
+        for _ in range(3):
+            Follow.objects.filter(user=fans[-1]).delete()
+            Follow.objects.create(user=fans[-1], author=self.author)
+        self.assertFalse(Job.objects.filter(name=RESTORE).exists())
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    @override_settings(
+        POSTS_PAGINATION='cursor', POSTS_IN_PAGE=2, FOLLOW_FANOUT_LIMIT=10)
+    def test_timeline_feed_with_cursor_pagination(self):
+        for follower in [self.reader] + [
+                User.objects.create_user(username=f'fan{i}')
+                for i in range(2)]:
+            Follow.objects.create(user=follower, author=self.author)
+        posts = [
+            Post.objects.create(author=self.author, text=test_post_text)
+            for _ in range(5)
+        ]
+        queryset, fields = follow_feed(self.reader)
+        self.assertEqual(fields[0], 'timeline_date')
+        response = self.client.get(self.url)
+        seen = list(response.context['page_obj'])
+        page = response.context['page_obj']
+        while page.has_next():
+            page = self.client.get(
+                self.url, {'after': page.next_cursor}).context['page_obj']
+            seen.extend(page)
+        self.assertEqual(seen, posts[::-1])
+
+    @override_settings(FOLLOW_TIMELINE=False)
+    def test_read_time_feed_when_timeline_disabled(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text=test_post_text)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.feed(), [post])
@@ -7,6 +7,7 @@ from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.conf import settings
+from django.core.cache import cache
 from django.urls import reverse
 
 from posts.models import Group, Post, Comment
@@ -79,6 +80,9 @@ class PostViewTests(TestCase):
         shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
 
     def setUp(self):
+        # Посты созданы bulk_create в обход сигналов: версии лент не
+        # сдвинулись, и кэш мог остаться от предыдущих тестов.
+        cache.clear()
         self.client = Client()
         self.client.force_login(self.user)
 
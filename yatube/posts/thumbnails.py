@@ -0,0 +1,77 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+from sorl.thumbnail import get_thumbnail
+
+from .caching import bump_post_versions
+from .models import Post
+
+# Форматы, которые пересохраняются без метаданных; остальные (например,
+# анимированные GIF) остаются как были.
+CLEANED_FORMATS = ('JPEG', 'PNG', 'WEBP')
+
+
+def clean_image(image):
+    """Поворачивает картинку по EXIF, уменьшает до IMAGE_MAX_SIZE
+    и пересохраняет без метаданных. Возвращает имя сохранённого файла.
+
+    Очищенная копия сохраняется рядом под новым именем, оригинал
+    не трогается: удалить его можно только после того, как пост
+    сохранён со ссылкой на копию.
+    """
+    storage, name = image.storage, image.name
+    with storage.open(name) as source:
+        picture = Image.open(source)
+        picture.load()
+    image_format = picture.format
+    if image_format not in CLEANED_FORMATS:
+        return name
+    picture = ImageOps.exif_transpose(picture)
+    size = settings.IMAGE_MAX_SIZE
+    picture.thumbnail((size, size))
+    if image_format == 'JPEG' and picture.mode not in ('RGB', 'L'):
+        picture = picture.convert('RGB')
+    buffer = BytesIO()
+    picture.save(buffer, image_format)
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def render_thumbnails(image):
+    """Создаёт все миниатюры из THUMBNAIL_RENDITIONS и возвращает их URL."""
+    return {
+        name: get_thumbnail(image, geometry, **options).url
+        for name, (geometry, options) in settings.THUMBNAIL_RENDITIONS.items()
+    }
+
+
+def process_post_image(post_id, clean=True):
+    """Очищает картинку поста и сохраняет URL миниатюр в Post.thumbnails.
+
+    clean=False только создаёт миниатюры: повторное пересохранение JPEG
+    каждый раз теряет качество.
+    """
+    post = (
+        Post.objects.only('pk', 'image', 'author_id', 'group_id')
+        .filter(pk=post_id).first()
+    )
+    if post is None or not post.image:
+        return None
+    original = post.image.name
+    if clean:
+        post.image.name = clean_image(post.image)
+    thumbnails = render_thumbnails(post.image)
+    # update() в обход сигналов: текст поста не меняется, меняется только
+    # вёрстка лент, поэтому их версии сдвигаются отдельно.
+    updated = Post.objects.filter(pk=post.pk, image=original).update(
+        image=post.image.name, thumbnails=thumbnails)
+    if post.image.name != original:
+        # Пост ссылается на копию - лишний оригинал; картинку успели
+        # заменить - лишняя копия. Удаляется после фиксации.
+        storage = post.image.storage
+        stale = original if updated else post.image.name
+        transaction.on_commit(lambda: storage.delete(stale))
+    bump_post_versions(post)
+    return thumbnails
@@ -1,22 +1,31 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = 'posts'
+# Ленты и страница поста: асинхронные варианты - для работы под ASGI.
+feeds = async_views if settings.ASYNC_FEED_VIEWS else views
 
 
 urlpatterns = [
-    path('', views.index, name='index'),
-    path('group/<slug:slug>/', views.group_post, name='group_post'),
-    path('profile/<str:username>/', views.profile, name='profile'),
+    path('', feeds.index, name='index'),
+    path('group/<slug:slug>/', feeds.group_post, name='group_post'),
+    path('profile/<str:username>/', feeds.profile, name='profile'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
-    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('posts/<int:post_id>/', feeds.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment,
         name='add_comment'),
-    path('follow/', views.follow_index, name='follow_index'),
+    path('follow/', feeds.follow_index, name='follow_index'),
+    path('search/', views.search, name='search'),
+    path('export/<str:kind>/', views.export, name='export'),
     path('profile/<str:username>/follow/',
          views.profile_follow, name='profile_follow'),
     path(
@@ -1,61 +1,113 @@
 from django.shortcuts import get_object_or_404, render, redirect
-from django.core.paginator import Paginator
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
 from django.conf import settings
-
+from django.db import transaction
+from django.template.loader import render_to_string
+
+from .caching import feed_cache_key, feed_count_key, feed_version
+from .conditional import (conditional, group_scopes, index_scopes,
+                          post_scopes, profile_scopes)
+from .counters import get_profile
+from .export import EXPORTS, FORMATS, export_lines
 from .forms import PostForm, CommentForm
-from .models import Post, Group, User, Follow
+from .models import Comment, Post, Group, User, Follow
+from .paginator import CachedCountPaginator, CursorPaginator
+from .search import search_posts
+from .timeline import follow_feed
 
 
-def pages(request, post_list):
+def pages(request, post_list, cursor_fields=('pub_date', 'pk'),
+          count_key=None, version=None):
     posts_in_page = settings.POSTS_IN_PAGE
-    paginator = Paginator(post_list, posts_in_page)
+    if settings.POSTS_PAGINATION == 'cursor':
+        paginator = CursorPaginator(post_list, posts_in_page, cursor_fields)
+        return paginator.get_page(
+            after=request.GET.get('after'),
+            before=request.GET.get('before'))
+    paginator = CachedCountPaginator(
+        post_list, posts_in_page, count_key, version)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
 
 
-def index(request):
-    post_list = Post.objects.all()
-    context = {
-        'page_obj': pages(request, post_list),
+def feed_context(request, post_list, feed, version,
+                 cursor_fields=('pub_date', 'pk')):
+    """Страница ленты feed и параметры кэша её фрагмента."""
+    return {
+        'page_obj': pages(
+            request, post_list, cursor_fields,
+            count_key=feed_count_key(feed), version=version),
+        'feed_cache_key': feed_cache_key(request, feed),
+        'feed_cache_version': version,
+        'feed_cache_timeout': settings.FEED_CACHE_TIMEOUT,
     }
+
+
+@conditional(index_scopes)
+def index(request):
+    post_list = Post.objects.for_feed()
+    version = feed_version('posts')
+    context = feed_context(request, post_list, 'index', version)
     return render(request, 'posts/index.html', context)
 
 
+@conditional(group_scopes)
 def group_post(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
+    post_list = group.posts.for_feed()
+    version = feed_version(f'group:{group.pk}')
     context = {
         'group': group,
-        'page_obj': pages(request, post_list),
+        **feed_context(request, post_list, f'group:{group.slug}', version),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@conditional(profile_scopes)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related('profile'), username=username)
     user = request.user
-    post_list = author.posts.all()
+    post_list = author.posts.for_feed()
     if request.user.is_authenticated:
         following = author.following.filter(user=user).exists()
     else:
         following = False
+    author_profile = get_profile(author)
+    version = feed_version(f'author:{author.pk}')
     context = {
-        'post_count': post_list.count(),
+        'post_count': author_profile.posts_count,
+        'author_profile': author_profile,
         'author': author,
         'following': following,
-        'page_obj': pages(request, post_list),
+        **feed_context(request, post_list, f'profile:{author.pk}', version),
     }
     return render(request, 'posts/profile.html', context)
 
 
+def comment_page(request, post_id):
+    """Страница комментариев поста по курсору (?after=), с авторами."""
+    comments = (
+        Comment.objects.filter(post_id=post_id).select_related('author')
+        .only('id', 'text', 'created', 'post_id',
+              'author__id', 'author__username')
+    )
+    paginator = CursorPaginator(
+        comments, settings.COMMENTS_PER_PAGE,
+        fields=('created', 'pk'), date_attr='created')
+    return paginator.get_page(after=request.GET.get('after'))
+
+
+@conditional(post_scopes)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    author = post.author
-    post_count = author.posts.all().count()
+    post = get_object_or_404(
+        Post.objects.select_related('author__profile', 'group'), id=post_id)
+    post_count = get_profile(post.author).posts_count
     form = CommentForm(request.POST or None)
-    comments = post.comment.all()
+    comments = comment_page(request, post.pk)
     context = {
         'post_count': post_count,
         'post': post,
@@ -66,6 +118,7 @@ def post_detail(request, post_id):
 
 
 @login_required
+@transaction.atomic
 def post_create(request):
     form = PostForm(request.POST or None,
                     files=request.FILES or None)
@@ -77,6 +130,19 @@ def post_create(request):
     return render(request, 'posts/create_post.html', {'form': form})
 
 
+@conditional(post_scopes)
+def post_comments(request, post_id):
+    """Следующая порция комментариев для кнопки «Показать ещё»."""
+    get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    comments = comment_page(request, post_id)
+    return JsonResponse({
+        'html': render_to_string(
+            'posts/includes/comment_list.html',
+            {'comments': comments}, request),
+        'next': comments.next_cursor,
+    })
+
+
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
@@ -96,6 +162,7 @@ def post_edit(request, post_id):
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
@@ -109,14 +176,50 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
+    post_list, cursor_fields = follow_feed(request.user)
+    feed = f'follow:{request.user.pk}'
+    version = feed_version('posts', feed)
+    context = feed_context(
+        request, post_list, feed, version, cursor_fields)
+    return render(request, 'posts/follow.html', context)
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        page_obj = search_posts(
+            query, settings.POSTS_IN_PAGE, after=request.GET.get('after'))
     context = {
-        'page_obj': pages(request, post_list),
+        'query': query,
+        'page_obj': page_obj,
     }
-    return render(request, 'posts/follow.html', context)
+    return render(request, 'posts/search.html', context)
+
+
+@staff_member_required
+def export(request, kind):
+    export_format = request.GET.get('format', 'ndjson')
+    if kind not in EXPORTS or export_format not in FORMATS:
+        raise Http404
+    try:
+        after_id = int(request.GET.get('after_id', 0))
+    except ValueError:
+        after_id = 0
+    content_type = {
+        'ndjson': 'application/x-ndjson; charset=utf-8',
+        'csv': 'text/csv; charset=utf-8',
+    }[export_format]
+    response = StreamingHttpResponse(
+        export_lines(kind, export_format, after_id),
+        content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename="{kind}-after-{after_id}.{export_format}"')
+    return response
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     user = request.user
@@ -126,6 +229,7 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     user = request.user
     author = get_object_or_404(User, username=username)
@@ -15,7 +15,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SECRET_KEY = os.getenv('SECRET_KEY')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DEBUG', 'True') == 'True'
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -45,8 +45,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.profiling.ProfilingMiddleware',
+    'core.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.sessions.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -78,18 +80,119 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+# База выбирается переменными окружения (.env, см. load_dotenv выше):
+# DB_ENGINE=postgresql - PostgreSQL из docker-compose.yaml, иначе SQLite.
+if os.getenv('DB_ENGINE') == 'postgresql':
+    # DB_POOL_SIZE > 0 - пул соединений процесса (core.db.postgresql),
+    # иначе соединение потока живёт DB_CONN_MAX_AGE секунд.
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 0))
+    DATABASES = {
+        'default': {
+            'ENGINE': 'core.db.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'postgres'),
+            'USER': os.getenv('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'db'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_MAX_AGE': (
+                0 if DB_POOL_SIZE
+                else int(os.getenv('DB_CONN_MAX_AGE', 60))),
+            'CONN_HEALTH_CHECKS': True,
+            'POOL': {
+                'min_size': min(2, DB_POOL_SIZE),
+                'max_size': DB_POOL_SIZE,
+                'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+            } if DB_POOL_SIZE else None,
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        }
     }
-}
 
+# Реплики для чтения (core.replicas): DB_REPLICAS - через запятую файлы
+# SQLite или хосты PostgreSQL. Остальные параметры - как у основной базы;
+# в тестах реплики смотрят в тестовую основную базу.
+DATABASE_REPLICAS = []
+for number, location in enumerate(
+        filter(None, os.getenv('DB_REPLICAS', '').split(',')), 1):
+    replica = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if replica['ENGINE'] == 'django.db.backends.sqlite3':
+        replica['NAME'] = location.strip()
+    else:
+        replica['HOST'] = location.strip()
+    DATABASES[f'replica{number}'] = replica
+    DATABASE_REPLICAS.append(f'replica{number}')
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+
+# PRAGMA для каждого соединения SQLite (core.sqlite); SQLITE_TUNING=0 -
+# настройки SQLite по умолчанию.
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+} if os.getenv('SQLITE_TUNING', '1') == '1' else {}
+
+# Общий кэш выбирается CACHE_BACKEND: locmem - свой у каждого процесса,
+# file и db - общие для процессов одной машины без отдельных сервисов
+# (для db: manage.py createcachetable), memcached и redis - общие для
+# всех машин. CACHE_LOCATION - каталог, таблица или адрес сервера.
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', ''),
+    'file': (
+        'django.core.cache.backends.filebased.FileBasedCache',
+        os.path.join(BASE_DIR, 'cache'),
+    ),
+    'db': ('django.core.cache.backends.db.DatabaseCache', 'cache_table'),
+    'memcached': (
+        'django.core.cache.backends.memcached.PyMemcacheCache',
+        '127.0.0.1:11211',
+    ),
+    'redis': (
+        'django.core.cache.backends.redis.RedisCache',
+        'redis://127.0.0.1:6379',
+    ),
+}
+_cache_backend, _cache_location = CACHE_BACKENDS[
+    os.getenv('CACHE_BACKEND', 'locmem')]
 CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+    'shared': {
+        'BACKEND': _cache_backend,
+        'LOCATION': os.getenv('CACHE_LOCATION', _cache_location),
+    },
 }
+# CACHE_L1=1 - перед общим кэшем небольшой LRU в памяти процесса
+# (core.cache.TwoLevelCache), иначе default - сам общий кэш.
+if os.getenv('CACHE_L1', '') == '1':
+    CACHES['default'] = {
+        'BACKEND': 'core.cache.TwoLevelCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'L1_MAX_ENTRIES': int(os.getenv('CACHE_L1_MAX_ENTRIES', 1000)),
+            'L1_TIMEOUT': float(os.getenv('CACHE_L1_TIMEOUT', 30)),
+        },
+    }
+else:
+    CACHES['default'] = CACHES['shared']
+
+# Хранилище сессий (SESSION_STORE): db - таблица django_session;
+# cached_db - чтение из общего кэша, запись в кэш и таблицу; cookies -
+# подписанная cookie без хранилища на сервере (выход не отменяет
+# сохранённую копию cookie, данные сессии - не больше 4 КБ).
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[os.getenv('SESSION_STORE', 'db')]
+# Мимо L1 (core.cache): сессия, удалённая при выходе, не должна
+# оставаться в памяти других процессов.
+SESSION_CACHE_ALIAS = 'shared'
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
@@ -138,5 +241,75 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 # Блок определения констант проекта: (Кол-во постов на странице и т.д.)
 POSTS_IN_PAGE = 10
+# Сколько соседних страниц показывать с каждой стороны от текущей.
+PAGINATOR_WINDOW = 2
+# Режим пагинации лент: 'pages' - нумерованные страницы (?page=N),
+# 'cursor' - по курсору (pub_date, id) без COUNT(*) и OFFSET.
+POSTS_PAGINATION = os.getenv('POSTS_PAGINATION', 'pages')
+# Сколько секунд после записи браузер читает только с основной базы.
+REPLICA_PIN_SECONDS = 10
+# Представления, которые без cookie сессии обходятся без неё
+# (core.sessions.SessionMiddleware).
+SESSIONLESS_VIEWS = ('posts:index', 'posts:group_post')
+# Комментариев на странице поста и в каждой подгрузке.
+COMMENTS_PER_PAGE = 20
+# Асинхронные ленты и страница поста (posts.async_views) под ASGI.
+ASYNC_FEED_VIEWS = os.getenv('ASYNC_FEED_VIEWS', '') == '1'
+# Наибольший размер страницы JSON API (?limit=).
+API_MAX_PAGE_SIZE = 100
+# Время жизни фрагментов лент в кэше: ключ включает версию содержимого,
+# поэтому изменения видны сразу, а срок лишь ограничивает память.
+FEED_CACHE_TIMEOUT = 60 * 60 * 3
+# Защита от одновременного пересчёта (core.caching.get_or_refresh):
+# сколько хранить устаревшее значение после срока, на сколько брать
+# блокировку пересчёта и сколько ждать чужого пересчёта, если значения нет.
+CACHE_STALE_TIMEOUT = 60 * 10
+CACHE_LOCK_TIMEOUT = 30
+CACHE_LOCK_WAIT = 0.5
+# Вероятность досрочного пересчёта (XFetch): больше - раньше.
+CACHE_EARLY_REFRESH_BETA = 1.0
+# Лента подписок из таблицы TimelineEntry, заполняемой при публикации.
+FOLLOW_TIMELINE = True
+# Посты авторов с таким числом подписчиков и больше не раскладываются
+# по лентам, а добавляются при чтении.
+FOLLOW_FANOUT_LIMIT = 1000
+# Снова раскладываются, когда подписчиков меньше FOLLOW_FANOUT_LIMIT на
+# столько: подписки и отписки у границы не перекладывают ленты.
+FOLLOW_FANOUT_HYSTERESIS = 100
+# Сколько последних постов автора попадает в ленту при подписке.
+FOLLOW_BACKFILL = 500
+# Миниатюры, создаваемые при загрузке картинки: имя -> (размер, параметры).
+THUMBNAIL_RENDITIONS = {
+    'feed': ('150x339', {'crop': 'top', 'upscale': True}),
+    'group': ('150x339', {'crop': 'center', 'upscale': True}),
+    'detail': ('100x100', {'crop': 'center', 'upscale': True}),
+}
+# Загруженные картинки уменьшаются до этого размера по большей стороне.
+IMAGE_MAX_SIZE = 1920
+
+# Очередь задач (core.Job), обработчик: manage.py run_jobs.
+# Без обработчика задачи выполняются сразу после фиксации транзакции,
+# прямо в запросе. Развёртывание с запущенным run_jobs ставит
+# JOBS_EAGER=0, и тогда задачи идут через очередь (см. README).
+JOBS_EAGER = os.getenv('JOBS_EAGER', '1') == '1'
+# Пауза перед повтором упавшей задачи, удваивается с каждой попыткой.
+JOBS_RETRY_DELAY = 30
+# Задача, взятая в работу раньше, считается брошенной и возвращается.
+JOBS_LOCK_TIMEOUT = 60 * 10
+# Периодические задачи: имя -> интервал в секундах.
+JOBS_PERIODIC = {
+    'posts.rebuild_counters': 60 * 60,
+}
+
+# Бюджет manage.py bench_urls: {маршрут: {показатель: предел}}, '*' - для
+# всех маршрутов. Показатели: queries, sql_ms, template_ms, p50_ms, p95_ms.
+BENCH_URL_BUDGETS = {
+    '*': {'queries': 15, 'p95_ms': 500},
+}
+# Доля запросов, профилируемых core.profiling.ProfilingMiddleware (0 - выкл.).
+# Сводка: /profiling/ (для персонала) и manage.py profiling_stats.
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+# Как часто (в секундах) процесс выкладывает свою сводку в кэш.
+PROFILING_PUBLISH_INTERVAL = 10
 
 DEFAULT_AUTO_FIELD='django.db.models.AutoField'
\ No newline at end of file
@@ -4,12 +4,16 @@ from django.conf import settings
 from django.conf.urls.static import static
 import debug_toolbar
 
+from core.views import profiling_stats
+
 urlpatterns = [
     path('', include('posts.urls'), name='posts'),
+    path('api/v1/', include('posts.api_urls', namespace='api')),
     path('about/', include('about.urls'), name='about'),
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
+    path('profiling/', profiling_stats, name='profiling'),
 ]
 
 handler404 = 'core.views.page_not_found'